@@ -0,0 +1,177 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# Runs every screen in the configuration against replayed data and reports
+# the frame rate, the paint time of each instrument and the CPU used.
+#
+#   python -m pyefis.benchmark --duration 10
+#
+# --projection compares the batched VirtualVfr chart projection with the
+# per-point one instead.
+#
+# It runs offscreen unless QT_QPA_PLATFORM says otherwise.
+
+import os
+import sys
+import time
+import random
+import argparse
+import logging
+
+from PyQt5.QtCore import *
+from PyQt5.QtWidgets import *
+
+import yaml
+
+import pyefis.hmi as hmi
+import pyefis.gui as gui
+import pyefis.replay as replay
+import pyefis.profiler as profiler
+
+
+# Times every paint event that goes through the application
+class BenchmarkApplication(QApplication):
+    def __init__(self, argv):
+        super(BenchmarkApplication, self).__init__(argv)
+        self.paints = {}
+
+    def notify(self, receiver, event):
+        if event.type() != QEvent.Paint:
+            return super(BenchmarkApplication, self).notify(receiver, event)
+        start = time.perf_counter()
+        result = super(BenchmarkApplication, self).notify(receiver, event)
+        t = time.perf_counter() - start
+        # Graphics views paint through their viewport
+        parent = receiver.parentWidget()
+        if isinstance(parent, QAbstractScrollArea) and parent.viewport() is receiver:
+            receiver = parent
+        try:
+            self.paints[receiver].append(t)
+        except KeyError:
+            self.paints[receiver] = [t]
+        return result
+
+
+def wait(app, seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+
+def runScreen(app, name, duration, warmup=1.0):
+    gui.mainWindow.showScreen(name)
+    wait(app, warmup)
+    app.paints = {}
+    if gui.scheduler is not None:
+        gui.scheduler.resetStats()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    wait(app, duration)
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+
+    result = {"screen":name, "seconds":wall, "cpu":cpu / wall * 100.0,
+              "fps":None, "instruments":[]}
+    if gui.scheduler is not None:
+        result["fps"] = gui.scheduler.getStats(name)["frames"] / wall
+    for w, times in app.paints.items():
+        times.sort()
+        result["instruments"].append({"name":profiler.widgetName(w),
+            "count":len(times),
+            "rate":len(times) / wall,
+            "mean":sum(times) / len(times),
+            "p99":times[min(len(times) - 1, int(len(times) * 0.99))],
+            "total":sum(times)})
+    result["instruments"].sort(key=lambda x: x["total"], reverse=True)
+    return result
+
+def report(result):
+    fps = "n/a" if result["fps"] is None else "{0:.1f}".format(result["fps"])
+    print("Screen {0}: {1} frames/sec, {2:.1f}% CPU".format(result["screen"],
+          fps, result["cpu"]))
+    print("  {0:32} {1:>8} {2:>10} {3:>10} {4:>10}".format("Instrument",
+          "paints/s", "mean ms", "p99 ms", "total ms"))
+    for i in result["instruments"]:
+        print("  {0:32} {1:8.1f} {2:10.3f} {3:10.3f} {4:10.1f}".format(
+              i["name"][:32], i["rate"], i["mean"] * 1000, i["p99"] * 1000,
+              i["total"] * 1000))
+    print()
+
+def projectionBenchmark(count, repeat=20):
+    from pyefis.instruments.ai import VirtualVfr
+    pov = VirtualVfr.PointOfView(None, None, None)
+    pov.display_width = 640
+    pov.gps_lat, pov.gps_lng = 35.0, -106.6
+    pov.altitude = 5000
+    pov.true_heading = 30
+    pov.update_screen()
+    lats = [pov.gps_lat + random.uniform(-1.5, 1.5) for i in range(count)]
+    lngs = [pov.gps_lng + random.uniform(-1.5, 1.5) for i in range(count)]
+    start = time.perf_counter()
+    for i in range(repeat):
+        for lat, lng in zip(lats, lngs):
+            pov.point2D(lat, lng)
+    single = (time.perf_counter() - start) / repeat
+    print("Projecting {0} points".format(count))
+    print("  per point {0:10.3f} ms".format(single * 1000))
+    if VirtualVfr.numpy is None:
+        print("  batched   n/a, numpy is not installed")
+        return
+    start = time.perf_counter()
+    for i in range(repeat):
+        pov.project(lats, lngs)
+    batched = (time.perf_counter() - start) / repeat
+    print("  batched   {0:10.3f} ms ({1:.1f}x)".format(batched * 1000,
+          single / batched))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='pyEfis screen benchmark')
+    parser.add_argument('--config-file', type=argparse.FileType('r'),
+                        help='Alternate configuration file')
+    parser.add_argument('--replay', default='synthetic', metavar='FILE',
+                        help='Recording to play, "synthetic" for generated data')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Playback speed multiplier')
+    parser.add_argument('--duration', type=float, default=5.0,
+                        help='Seconds to run each screen')
+    parser.add_argument('--screens', nargs='*',
+                        help='Screens to run, all of them if not given')
+    parser.add_argument('--projection', type=int, metavar='POINTS',
+                        help='Benchmark the VirtualVfr projection with this many points')
+    args = parser.parse_args()
+
+    if args.projection:
+        projectionBenchmark(args.projection)
+        return
+
+    cf = args.config_file if args.config_file else open('pyefis/config/main.yaml')
+    config = yaml.load(cf, Loader=yaml.SafeLoader)
+    config["main"]["screenFullSize"] = False
+    logging.basicConfig(level=logging.WARNING)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = BenchmarkApplication(sys.argv[:1])
+    replay.initialize(config, args.replay, args.speed)
+    hmi.initialize(config)
+    gui.initialize(config)
+
+    names = args.screens if args.screens else list(config["screens"])
+    for name in names:
+        report(runScreen(app, name, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -30,3 +30,11 @@ def bounds(min, max, value):
         return max
     else:
         return value
+
+def limitState(value, lowWarn, lowAlarm, highWarn, highAlarm):
+    """Returns which of the limits value is past.  A gauge's colors only
+       change when this does."""
+    return (lowWarn is not None and value < lowWarn,
+            lowAlarm is not None and value < lowAlarm,
+            highWarn is not None and value > highWarn,
+            highAlarm is not None and value > highAlarm)
@@ -0,0 +1,83 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# A k-d tree for finding chart objects near a position.  Distances are
+# weighted per axis at query time so that a degree of longitude can be
+# scaled for the latitude it is measured at.  Of points at equal distances
+# the one given to the tree first is returned.
+
+
+class KDTree(object):
+    def __init__(self, points, items=None):
+        """ points is a list of coordinate tuples and items an optional
+            list of the objects they belong to
+        """
+        if items is None:
+            items = points
+        self.items = list(items)
+        self.size = len(points)
+        self.dimensions = len(points[0]) if self.size > 0 else 0
+        nodes = [(tuple(p), i, items[i]) for i,p in enumerate(points)]
+        self.root = self.build(nodes, 0)
+
+    def __len__(self):
+        return self.size
+
+    def build(self, nodes, depth):
+        # Each node is [point, order, item, axis, left, right]
+        if len(nodes) == 0:
+            return None
+        axis = depth % self.dimensions
+        nodes.sort(key=lambda n: n[0][axis])
+        median = len(nodes) // 2
+        point, order, item = nodes[median]
+        return [point, order, item, axis,
+                self.build(nodes[:median], depth + 1),
+                self.build(nodes[median+1:], depth + 1)]
+
+    def distance2(self, a, b, weights):
+        d = 0.0
+        for x, y, w in zip(a, b, weights):
+            d += ((x - y) * w) ** 2
+        return d
+
+    def nearest(self, point, weights=None):
+        """ Returns (distance, item) for the point closest to point or None
+            if the tree is empty
+        """
+        if self.root is None:
+            return None
+        if weights is None:
+            weights = (1.0,) * self.dimensions
+        best = [None, None, None]      # distance squared, order, item
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            npoint, order, item, axis = node[:4]
+            d = self.distance2(point, npoint, weights)
+            if best[0] is None or d < best[0] or (d == best[0] and order < best[1]):
+                best = [d, order, item]
+            diff = point[axis] - npoint[axis]
+            near, far = (node[4], node[5]) if diff < 0 else (node[5], node[4])
+            diff *= weights[axis]
+            # Equal distances still have to look on the far side for an
+            # earlier point
+            if best[0] is None or diff * diff <= best[0]:
+                stack.append(far)
+            stack.append(near)
+        return (best[0] ** 0.5, best[2])
@@ -0,0 +1,89 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# Instruments draw the same few strings over and over again.  This keeps
+# the laid out text around so that it only has to be shaped once.
+
+from collections import OrderedDict
+
+from PyQt5.QtGui import *
+from PyQt5.QtCore import *
+
+
+class TextCache(object):
+    """Least recently used cache of QStaticText objects.  The color isn't
+       part of the key because the pen is applied when the text is drawn."""
+    def __init__(self, size=512):
+        self.size = size
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, font, text):
+        key = (font.key(), text)
+        try:
+            st = self.items[key]
+            self.items.move_to_end(key)
+            self.hits += 1
+        except KeyError:
+            self.misses += 1
+            st = QStaticText(text)
+            st.setTextFormat(Qt.PlainText)
+            st.prepare(QTransform(), font)
+            self.items[key] = st
+            if len(self.items) > self.size:
+                self.items.popitem(last=False)
+        return st
+
+    def clear(self):
+        self.items.clear()
+
+    def resetStats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def getStats(self):
+        total = self.hits + self.misses
+        return {"size": len(self.items), "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
+
+
+cache = TextCache()
+
+
+def drawText(p, rect, text, option=None):
+    """Drop in replacement for QPainter.drawText(QRectF, str, QTextOption)
+       that uses the shared cache.  Only the alignment of option is used."""
+    if option is None:
+        align = Qt.AlignLeft | Qt.AlignTop
+    else:
+        align = option.alignment()
+    st = cache.get(p.font(), text)
+    size = st.size()
+    if align & Qt.AlignRight:
+        x = rect.right() - size.width()
+    elif align & Qt.AlignHCenter:
+        x = rect.left() + (rect.width() - size.width()) / 2
+    else:
+        x = rect.left()
+    if align & Qt.AlignBottom:
+        y = rect.bottom() - size.height()
+    elif align & Qt.AlignVCenter:
+        y = rect.top() + (rect.height() - size.height()) / 2
+    else:
+        y = rect.top()
+    p.drawStaticText(QPointF(x, y), st)
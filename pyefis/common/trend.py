@@ -0,0 +1,108 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# Works out how fast a value is changing from timestamped samples.  The
+# rate is the least squares slope of the samples in the last few seconds so
+# it doesn't depend on how often the value is sent.  Running sums are kept
+# so adding a sample and reading the rate take the same time however many
+# samples there are.
+
+import time
+from collections import deque
+
+
+class TrendEstimator(object):
+    def __init__(self, window=2.0, clock=time.monotonic):
+        self.window = window          # seconds of samples to fit
+        self.clock = clock
+        self.samples = deque()
+        self.origin = None
+        self.clear()
+
+    def clear(self):
+        self.clear_sums()
+        self.origin = None
+
+    def __len__(self):
+        return len(self.samples)
+
+    def add(self, value, t=None):
+        if t is None:
+            t = self.clock()
+        if self.origin is None:
+            self.origin = t
+        t -= self.origin
+        self.samples.append((t, value))
+        self.st += t
+        self.sv += value
+        self.stt += t * t
+        self.stv += t * value
+        self.prune(t + self.origin)
+        # Keep the times small so the sums don't lose precision
+        if t > self.window * 10:
+            self.rebase()
+
+    def prune(self, now):
+        """ Drops the samples that are older than the window at time now """
+        if self.origin is None:
+            return
+        t = now - self.origin
+        while self.samples and t - self.samples[0][0] > self.window:
+            ot, ov = self.samples.popleft()
+            self.st -= ot
+            self.sv -= ov
+            self.stt -= ot * ot
+            self.stv -= ot * ov
+        if not self.samples:
+            self.clear()
+
+    def rebase(self):
+        shift = self.samples[0][0]
+        self.origin += shift
+        samples = [(t - shift, v) for t, v in self.samples]
+        self.clear_sums()
+        self.samples.extend(samples)
+        for t, v in samples:
+            self.st += t
+            self.sv += v
+            self.stt += t * t
+            self.stv += t * v
+
+    def clear_sums(self):
+        self.samples.clear()
+        self.st = self.sv = self.stt = self.stv = 0.0
+
+    def rate(self, now=None):
+        """ Change in the value per second, 0 unless there are two samples
+            at different times in the last window.  A value that stops
+            changing stops being sent so the rate dies away with time.
+        """
+        if now is None:
+            now = self.clock()
+        self.prune(now)
+        n = len(self.samples)
+        if n < 2:
+            return 0.0
+        d = n * self.stt - self.st * self.st
+        if d <= 0:
+            return 0.0
+        return (n * self.stv - self.st * self.sv) / d
+
+    def value(self):
+        """ The latest value, 0 if there hasn't been a sample """
+        if not self.samples:
+            return 0.0
+        return self.samples[-1][1]
@@ -21,10 +21,16 @@ from PyQt5.QtWidgets import *
 import importlib
 import logging
 import sys
+import time
+import weakref
+from collections import OrderedDict
 from pyefis import hooks
 from pyefis import hmi
+from pyefis import hub
 
 screens = []
+scheduler = None
+startTime = None
 
 # This class is just a structure to hold information about a single
 # screen that will be loaded.
@@ -41,15 +47,178 @@ class Screen(QObject):
         # This would hold the instantiated Screen object from the module.
         self.object = None
         self.default = False
+        # Lazy screens aren't built until they are first shown or until
+        # the prewarm gets to them once the main window is up.
+        self.lazy = bool(config.get("lazy", False))
+        self.prewarm = bool(config.get("prewarm", True))
+        self.buildTime = None
+        self.buildReason = None
+        # While a screen is suspended the redraws that its instruments
+        # ask for are thrown away.
+        self.suspended = False
+        self.screenShow.connect(self.resume)
+        self.screenHide.connect(self.suspend)
+
+    def build(self, parent, reason="startup"):
+        start = time.perf_counter()
+        self.object = self.module.Screen(parent)
+        # TODO Figure out how to have different size screens
+        self.object.resize(parent.screenWidth, parent.screenHeight)
+        self.object.move(0,0)
+        self.buildTime = time.perf_counter() - start
+        self.buildReason = reason
+        log.debug("Loaded Screen {0} in {1:.3f} s ({2})".format(self.name,
+                  self.buildTime, reason))
+
+    def built(self):
+        return self.object is not None
 
     def show(self):
         self.object.show()
         self.screenShow.emit()
 
     def hide(self):
+        if self.object is None:
+            return
         self.object.hide()
         self.screenHide.emit()
 
+    def suspend(self):
+        self.suspended = True
+
+    # The redraws that the instruments asked for while we were suspended
+    # were thrown away.  Any widget on the screen that has a resync() method
+    # gets it called here and is expected to read the current values from
+    # the database, or whatever else it keeps, and redraw itself.  resync()
+    # can be called before the widget's first resizeEvent().  The default
+    # screen is shown before the main window is, so its instruments haven't
+    # been laid out yet and have nothing to catch up.
+    def resume(self):
+        self.suspended = False
+        if not self.object.isVisible():
+            return
+        for w in self.object.findChildren(QWidget):
+            resync = getattr(w, "resync", None)
+            if resync is not None:
+                resync()
+
+
+# Find the Screen that the widget lives on.  We cache the result since
+# widgets don't move between screens.
+_owners = weakref.WeakKeyDictionary()
+
+def findScreen(widget):
+    try:
+        return _owners[widget]
+    except KeyError:
+        pass
+    w = widget
+    while w is not None:
+        for s in screens:
+            if s.object is w:
+                _owners[widget] = s
+                return s
+        w = w.parentWidget()
+    return None
+
+
+# The FrameScheduler collects the redraw requests that the instruments make
+# when their data changes and runs each of them once per frame.  A data item
+# that changes several times between two frames only costs a single redraw.
+# Requests from a suspended screen are thrown away, see Screen.resume().
+class FrameScheduler(QObject):
+    frameStarted = pyqtSignal()
+
+    def __init__(self, rate=30, parent=None):
+        super(FrameScheduler, self).__init__(parent)
+        self.rate = rate
+        self.pending = OrderedDict()
+        self.budgets = {}
+        self.stats = {}
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.frame)
+
+    def start(self):
+        self.timer.start(int(round(1000.0 / self.rate)))
+
+    def stop(self):
+        self.timer.stop()
+
+    def setBudget(self, name, budget):
+        """Sets the amount of time in seconds that the screen given by name
+           is allowed to spend redrawing in a single frame"""
+        self.budgets[name] = budget
+
+    def getStats(self, name):
+        if name not in self.stats:
+            self.stats[name] = {"requests":0, "merged":0, "deferred":0,
+                                "suspended":0, "frames":0, "overruns":0,
+                                "last_time":0.0, "max_time":0.0}
+        return self.stats[name]
+
+    def schedule(self, widget, function):
+        screen = findScreen(widget)
+        name = None if screen is None else screen.name
+        stats = self.getStats(name)
+        stats["requests"] += 1
+        if screen is not None and screen.suspended:
+            stats["suspended"] += 1
+        elif function in self.pending:
+            stats["merged"] += 1
+        else:
+            self.pending[function] = name
+
+    def frame(self):
+        self.frameStarted.emit()
+        if not self.pending:
+            return
+        work = self.pending
+        self.pending = OrderedDict()
+        start = {}
+        for function, name in work.items():
+            now = time.perf_counter()
+            if name not in start:
+                start[name] = now
+                self.getStats(name)["frames"] += 1
+            budget = self.budgets.get(name)
+            if budget is not None and now - start[name] > budget:
+                # Out of time for this screen.  Push it to the next frame
+                # unless something has already asked for it again.
+                stats = self.getStats(name)
+                stats["deferred"] += 1
+                if function not in self.pending:
+                    self.pending[function] = name
+                continue
+            function()
+        now = time.perf_counter()
+        for name in start:
+            stats = self.getStats(name)
+            stats["last_time"] = now - start[name]
+            if stats["last_time"] > stats["max_time"]:
+                stats["max_time"] = stats["last_time"]
+            budget = self.budgets.get(name)
+            if budget is not None and stats["last_time"] > budget:
+                stats["overruns"] += 1
+
+    def resetStats(self):
+        self.stats = {}
+
+
+# Instruments call this instead of redrawing directly when their data
+# changes.  function is what gets called to do the redraw and defaults to
+# the widgets update() method.  Without a running scheduler the function
+# is just called right away unless the screen is suspended.
+def scheduleRedraw(widget, function=None):
+    if function is None:
+        function = widget.update
+    if scheduler is None:
+        screen = findScreen(widget)
+        if screen is None or not screen.suspended:
+            function()
+    else:
+        scheduler.schedule(widget, function)
+
 
 class Main(QMainWindow):
     keyPress = pyqtSignal(QEvent)
@@ -77,12 +246,9 @@ class Main(QMainWindow):
              w.setAutoFillBackground(True)
 
         for idx, scr in enumerate(screens):
-
-            scr.object = scr.module.Screen(self)
-            log.debug("Loading Screen {0}".format(scr.name))
-            # TODO Figure out how to have different size screens
-            scr.object.resize(self.width(), self.height())
-            scr.object.move(0,0)
+            if scr.lazy and not scr.default:
+                continue
+            scr.build(self)
             if scr.default:
                 scr.show()
                 self.running_screen = idx
@@ -101,6 +267,8 @@ class Main(QMainWindow):
                     break
         if found is not None:
             if found != self.running_screen:  # Make sure it's different.
+                if not screens[found].built():
+                    screens[found].build(self, "on demand")
                 screens[found].show()
                 screens[self.running_screen].hide()
                 self.running_screen = found
@@ -120,6 +288,17 @@ class Main(QMainWindow):
             self.showScreen(self.running_screen-1)
 
 
+    # Build the lazy screens one at a time while the event loop is idle so
+    # that the first show of each one is quick.
+    def prewarm(self):
+        for scr in screens:
+            if scr.prewarm and not scr.built():
+                scr.build(self, "prewarm")
+                scr.hide()
+                QTimer.singleShot(0, self.prewarm)
+                return
+        log.info("Screen prewarm complete")
+
     # We send signals for these events so everybody can play.
     def showEvent(self, event):
         self.windowShow.emit(event)
@@ -165,11 +344,47 @@ def setDefaultScreen(s):
     return found
 
 
+def startupReport():
+    """Returns a list of (name, seconds, reason) tuples for every screen
+       that has been built so far and logs the same."""
+    report = []
+    for scr in screens:
+        if scr.built():
+            report.append((scr.name, scr.buildTime, scr.buildReason))
+            log.info("Screen {0:12} {1:7.3f} s  {2}".format(scr.name,
+                     scr.buildTime, scr.buildReason))
+        else:
+            log.info("Screen {0:12} not built".format(scr.name))
+    return report
+
+
+def firstFrame():
+    log.info("First frame {0:.3f} s after startup".format(
+             time.perf_counter() - startTime))
+    startupReport()
+
+
 def initialize(config):
     global mainWindow
     global log
+    global scheduler
+    global startTime
+    startTime = time.perf_counter()
     log = logging.getLogger(__name__)
     log.info("Initializing Graphics")
+
+    # A frame rate of zero disables the scheduler and the instruments
+    # will redraw on every data update.
+    rate = config["main"].get("frameRate", 30)
+    if rate:
+        scheduler = FrameScheduler(float(rate))
+        for each in config['screens']:
+            budget = config['screens'][each].get("frame_budget")
+            if budget is not None:
+                scheduler.setBudget(each, float(budget))
+        scheduler.start()
+        hub.initialize(scheduler)
+        log.debug("Frame scheduler running at {0} Hz".format(rate))
     # Load the Screens
     for each in config['screens']:
         module = config['screens'][each]["module"]
@@ -217,3 +432,9 @@ def initialize(config):
         mainWindow.width = int(config["main"]["screenWidth"])
         mainWindow.height = int(config["main"]["screenHeight"])
         mainWindow.show()
+
+    # These run once the event loop has drawn the window
+    QTimer.singleShot(0, firstFrame)
+    delay = config["main"].get("prewarmDelay", 1.0)
+    if delay is not None:
+        QTimer.singleShot(int(float(delay) * 1000), mainWindow.prewarm)
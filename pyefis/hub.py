@@ -0,0 +1,156 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# Instruments subscribe to database values here instead of connecting to
+# the items themselves.  Each key is only connected once no matter how many
+# instruments use it.  Once the frame scheduler is running the values are
+# held until the start of the next frame so that an item that changes
+# several times in one frame is only delivered once, with its latest value.
+# Subscribers that are methods are only held weakly so an instrument that
+# goes away is dropped instead of being kept alive by the hub.
+
+from PyQt5.QtCore import *
+from PyQt5 import sip
+
+import inspect
+import weakref
+from functools import partial
+from collections import OrderedDict
+
+import pyavtools.fix as fix
+
+subscriptions = {}
+pending = OrderedDict()
+batching = False
+stats = {"received":0, "coalesced":0, "delivered":0}
+
+
+def callbackKey(callback):
+    if isinstance(callback, partial):
+        return (callbackKey(callback.func), callback.args)
+    if inspect.ismethod(callback):
+        return (id(callback.__self__), callback.__func__)
+    return callback
+
+
+class Callback(object):
+    def __init__(self, callback):
+        self.key = callbackKey(callback)
+        self.args = ()
+        self.keywords = {}
+        if isinstance(callback, partial) and inspect.ismethod(callback.func):
+            self.args = callback.args
+            self.keywords = callback.keywords
+            callback = callback.func
+        if inspect.ismethod(callback):
+            self.method = weakref.WeakMethod(callback)
+        else:
+            self.method = lambda: callback
+
+    def target(self):
+        """Returns the function to call or None once its object is gone"""
+        method = self.method()
+        if method is None:
+            return None
+        owner = getattr(method, "__self__", None)
+        if isinstance(owner, sip.simplewrapper) and sip.isdeleted(owner):
+            return None
+        return method
+
+
+class Subscription(QObject):
+    def __init__(self, key):
+        super(Subscription, self).__init__()
+        self.key = key
+        self.item = fix.db.get_item(key)
+        self.callbacks = []
+        self.dtype = self.item.dtype
+        self.item.valueChanged[self.dtype].connect(self.changed)
+        # The type can change when the item is reported again
+        self.item.reportReceived.connect(self.reconnect)
+
+    def reconnect(self):
+        if self.item.dtype != self.dtype:
+            self.item.valueChanged[self.dtype].disconnect(self.changed)
+            self.dtype = self.item.dtype
+            self.item.valueChanged[self.dtype].connect(self.changed)
+
+    def changed(self, value):
+        stats["received"] += 1
+        if not batching:
+            self.deliver(value)
+        elif self in pending:
+            stats["coalesced"] += 1
+            pending[self] = value
+        else:
+            pending[self] = value
+
+    def prune(self):
+        self.callbacks = [c for c in self.callbacks if c.target() is not None]
+
+    def deliver(self, value):
+        for callback in list(self.callbacks):
+            function = callback.target()
+            if function is None:
+                if callback in self.callbacks:
+                    self.callbacks.remove(callback)
+                continue
+            stats["delivered"] += 1
+            function(*callback.args, value, **callback.keywords)
+
+
+def subscribe(key, callback):
+    """Calls callback with the new value whenever the database item given
+       by key changes.  The subscription follows the item if its datatype
+       changes on a new report.  Subscribing the same callback twice does
+       nothing."""
+    try:
+        s = subscriptions[key]
+    except KeyError:
+        s = subscriptions[key] = Subscription(key)
+    s.prune()
+    ckey = callbackKey(callback)
+    if all(c.key != ckey for c in s.callbacks):
+        s.callbacks.append(Callback(callback))
+
+def unsubscribe(key, callback):
+    s = subscriptions.get(key)
+    if s is not None:
+        ckey = callbackKey(callback)
+        s.callbacks = [c for c in s.callbacks if c.key != ckey]
+
+def dispatch():
+    global pending
+    work = pending
+    pending = OrderedDict()
+    for s, value in work.items():
+        s.deliver(value)
+
+def subscriberCounts():
+    """Returns a dictionary of the number of subscribers for each key"""
+    for s in subscriptions.values():
+        s.prune()
+    return {key:len(s.callbacks) for key, s in subscriptions.items()}
+
+def resetStats():
+    for each in stats:
+        stats[each] = 0
+
+# Start holding values for the scheduler's frames
+def initialize(scheduler):
+    global batching
+    scheduler.frameStarted.connect(dispatch)
+    batching = True
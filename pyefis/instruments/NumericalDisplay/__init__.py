@@ -126,7 +126,10 @@ class NumericalDisplay(QGraphicsView):
             prest = '0' * (prelen - len(prest)) + prest
         if self._bad or self._old:
             prest = ''
-        self.pre_scroll_text.setText(prest)
+        # Laying out the text again is the expensive part so only do it
+        # when the leading digits actually change
+        if prest != self.pre_scroll_text.text():
+            self.pre_scroll_text.setText(prest)
         if not (self._bad or self._old or self._fail):
             self.scrolling_area.value = scroll_value
 
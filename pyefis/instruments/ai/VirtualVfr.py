@@ -14,12 +14,20 @@
 #  along with this program; if not, write to the Free Software
 #  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 
+import os
 import copy
+import json
 import math
 import time
 import threading
+import concurrent.futures
 
 from geomag import declination
+try:
+    import numpy
+except ImportError:
+    # Points are projected one at a time without it
+    numpy = None
 
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
@@ -30,6 +38,10 @@ import logging
 import pyavtools.fix as fix
 
 from pyefis.instruments.ai import AI
+from pyefis import gui
+from pyefis import hub
+from pyefis.common.kdtree import KDTree
+from pyefis.instruments.ai.chartcache import BlockCache
 import pyavtools.Spatial as Spatial
 import pyavtools.CIFPObjects as CIFPObjects
 
@@ -45,6 +57,7 @@ EARTH_RADIUS_M=6356752.0
 EARTH_RADIUS=EARTH_RADIUS_M * FEET_METER
 
 class VirtualVfr(AI):
+    blocksLoaded = pyqtSignal()
     CENTERLINE_WIDTH = 3
     MIN_FONT_SIZE=7
     RUNWAY_LABEL_FONT_FAMILY="Courier"
@@ -52,11 +65,22 @@ class VirtualVfr(AI):
     AIRPORT_FONT_SIZE=9
     PAPI_YOFFSET = 8
     PAPI_LIGHT_SPACING = 9
+    # Pixels a runway or airport has to move before it is redrawn
+    MOVE_THRESHOLD = 0.5
     VORTAC_ICON_PATH="vortac.png"
     def __init__(self, parent=None):
         super(VirtualVfr, self).__init__(parent)
+        # Runways and airports are scene items so this has to stay a scene
+        self.renderMode = "scene"
         self.display_objects = dict()
-        time.sleep(.4)      # Pause to let DB load
+        # Screen points of the runways and airports when they were last drawn
+        self.drawn = dict()
+        self.papi_drawn = dict()
+        self.airport_rects = dict()
+        self.approach_low = 2.5
+        self.approach_slightly_low = 2.8
+        self.approach_slightly_high = 3.2
+        self.approach_very_high = 3.5
         self.lng_item = fix.db.get_item("LONG")
         self.lat_item = fix.db.get_item("LAT")
         self.head_item = fix.db.get_item("HEAD")
@@ -75,66 +99,48 @@ class VirtualVfr(AI):
             self.alt_item.fail or self.alt_item.bad or self.alt_item.old
         # BUG: convert magnetic heading
         self.true_heading = self.head_item.value
+        self.heading = self.head_item.value
+        self.position_changed = False
+        self.heading_changed = False
         self.myparent = parent
         minfont = QFont(VirtualVfr.RUNWAY_LABEL_FONT_FAMILY, VirtualVfr.MIN_FONT_SIZE, QFont.Bold)
         t = QGraphicsSimpleTextItem ("9 9")
         t.setFont (minfont)
         self.min_font_width = t.boundingRect().width()
         self.pov = None
+        # The chart blocks are loaded in another thread
+        self.blocksLoaded.connect(self.blocks_loaded, Qt.QueuedConnection)
+        for item in (self.lng_item, self.lat_item, self.head_item, self.alt_item):
+            item.badChanged[bool].connect(self.setBlank)
+            item.oldChanged[bool].connect(self.setBlank)
+            item.failChanged[bool].connect(self.setBlank)
 
     def resizeEvent(self, event):
         super(VirtualVfr, self).resizeEvent(event)
+        # The old items went with the old scene
+        self.display_objects = dict()
+        self.drawn = dict()
+        self.papi_drawn = dict()
         self.pov = PointOfView(self.myparent.get_config_item('dbpath'),
                                self.myparent.get_config_item('indexpath'),
-                               self.myparent.get_config_item('refresh_period'))
+                               self.myparent.get_config_item('refresh_period'),
+                               self.blocksLoaded.emit,
+                               self.myparent.get_config_item('cachepath'))
         self.pov.initialize(["Runway", "Airport"], self.scene.width(),
                     self.lng, self.lat, self.altitude, self.true_heading)
-        self.lng_item.valueChanged[float].connect(self.setLongitude)
-        self.lng_item.badChanged[bool].connect(self.setBlank)
-        self.lng_item.oldChanged[bool].connect(self.setBlank)
-        self.lng_item.failChanged[bool].connect(self.setBlank)
-        self.lat_item.valueChanged[float].connect(self.setLatitude)
-        self.lat_item.badChanged[bool].connect(self.setBlank)
-        self.lat_item.oldChanged[bool].connect(self.setBlank)
-        self.lat_item.failChanged[bool].connect(self.setBlank)
-        self.head_item.valueChanged[float].connect(self.setHeading)
-        self.head_item.badChanged[bool].connect(self.setBlank)
-        self.head_item.oldChanged[bool].connect(self.setBlank)
-        self.head_item.failChanged[bool].connect(self.setBlank)
-        self.alt_item.valueChanged[float].connect(self.setAltitude)
-        self.alt_item.badChanged[bool].connect(self.setBlank)
-        self.alt_item.oldChanged[bool].connect(self.setBlank)
-        self.alt_item.failChanged[bool].connect(self.setBlank)
+        self.font_sizes = font_size_table(VirtualVfr.RUNWAY_LABEL_FONT_FAMILY,
+                                          self.pov.chart_cache)
+        self.font_sizes.build(int(self.scene.width()))
+        # These need the point of view.  Subscribing again is a no-op.
+        hub.subscribe("LONG", self.setLongitude)
+        hub.subscribe("LAT", self.setLatitude)
+        hub.subscribe("HEAD", self.setHeading)
+        hub.subscribe("ALT", self.setAltitude)
         if not self.rendering_prohibited:
             self.pov.render(self)
 
     def get_largest_font_size(self, width):
-        max_size = 25
-        min_size = VirtualVfr.MIN_FONT_SIZE
-        incr = (max_size - min_size) / 4
-        ret = (max_size - min_size) / 2
-        t = QGraphicsSimpleTextItem ("9 9")
-        while True:
-            font = QFont(VirtualVfr.RUNWAY_LABEL_FONT_FAMILY, ret, QFont.Bold)
-            t.setFont (font)
-            if t.boundingRect().width() * 1.5 > width:
-                max_size = ret
-                ret -= incr
-                if ret < min_size:
-                    ret = min_size
-                    break
-            else:
-                break
-        incr = int((max_size - min_size) / 2)
-        while incr > 0:
-            ret += incr
-            font = QFont(VirtualVfr.RUNWAY_LABEL_FONT_FAMILY, ret, QFont.Bold)
-            t.setFont (font)
-            if t.boundingRect().width() * 1.1 > width:
-                ret -= incr
-                incr /= 2
-                incr = int(incr)
-        return ret
+        return self.font_sizes.lookup(width)
 
     def get_runway_labels(self, name):
         rwnum_string = ''.join([d for d in name if d >= '0' and d <= '9'])
@@ -151,11 +157,49 @@ class VirtualVfr(AI):
         ret.append(rwnum_string + recip_postfix[postfix])
         return ret
 
+    def papi_red_count(self, touchdown_distance, elevation):
+        height_touchdown = self.altitude - elevation
+        if touchdown_distance <= 0:
+            return 4 if height_touchdown <= 0 else 0
+        approach_angle = math.atan(height_touchdown / touchdown_distance) * DEG_RAD
+        if approach_angle < self.approach_low:
+            return 4
+        elif approach_angle < self.approach_slightly_low:
+            return 3
+        elif approach_angle < self.approach_slightly_high:
+            return 2
+        elif approach_angle < self.approach_very_high:
+            return 1
+        else:
+            return 0
+
+    def moved(self, key, points):
+        """ True if any of points is more than MOVE_THRESHOLD pixels from
+            where it was when key was last drawn
+        """
+        drawn = self.drawn.get(key)
+        if drawn is None or len(drawn) != len(points):
+            return True
+        for new, old in zip(points, drawn):
+            if abs(new[0] - old[0]) >= VirtualVfr.MOVE_THRESHOLD or \
+                    abs(new[1] - old[1]) >= VirtualVfr.MOVE_THRESHOLD:
+                return True
+        return False
+
     def render_runway(self, p11, p12, p21, p22, touchdown_distance,
                             elevation, length, bearing, name, airport_id, zoom):
         if not self.isVisible():
             return
 
+        key = name+airport_id
+        papi_redcount = self.papi_red_count(touchdown_distance, elevation)
+        # Leave it alone if it hasn't moved enough to see
+        if key in self.display_objects and self.papi_drawn.get(key) == papi_redcount \
+                and not self.moved(key, [p11, p12, p21, p22]):
+            return
+        self.drawn[key] = [p11, p12, p21, p22]
+        self.papi_drawn[key] = papi_redcount
+
         rwlabels = self.get_runway_labels (name)
         if p11[1] > p21[1]:
             draw_width = abs(p11[0] - p12[0])
@@ -172,7 +216,6 @@ class VirtualVfr(AI):
                 left_bottom = p22
             label = rwlabels[1]
 
-        key = name+airport_id
         if key in self.display_objects:
             # print ("update existing runway polygon %s"%key)
             poly = QPolygonF([QPoint(*p11), QPoint(*p12), QPoint(*p21), QPoint(*p22)])
@@ -295,22 +338,6 @@ class VirtualVfr(AI):
                 #print ("%s extendedline %s->%s"%(key, touchdown_point, extended_point))
 
             # Draw PAPI lights
-            height_touchdown = self.altitude - elevation
-            approach_angle = math.atan(height_touchdown / touchdown_distance) * DEG_RAD
-            self.approach_low = 2.5
-            self.approach_slightly_low = 2.8
-            self.approach_slightly_high = 3.2
-            self.approach_very_high = 3.5
-            if approach_angle < self.approach_low:
-                papi_redcount = 4
-            elif approach_angle < self.approach_slightly_low:
-                papi_redcount = 3
-            elif approach_angle < self.approach_slightly_high:
-                papi_redcount = 2
-            elif approach_angle < self.approach_very_high:
-                papi_redcount = 1
-            else:
-                papi_redcount = 0
             papi_total_width = 5 * VirtualVfr.PAPI_LIGHT_SPACING
             x = left_bottom[0] - papi_total_width + VirtualVfr.PAPI_LIGHT_SPACING/2
             y = left_bottom[1] - VirtualVfr.PAPI_YOFFSET
@@ -350,6 +377,8 @@ class VirtualVfr(AI):
 
     def eliminate_runway (self, name, airport_id):
         key = name+airport_id
+        self.drawn.pop(key, None)
+        self.papi_drawn.pop(key, None)
         if key in self.display_objects:
             self.scene.removeItem (self.display_objects[key])
             del self.display_objects[key]
@@ -380,6 +409,13 @@ class VirtualVfr(AI):
 
     def render_airport(self, point, name, airport_id, zoom, space_occupied):
         akey = airport_id
+        if akey in self.airport_rects and not akey in self.display_objects:
+            # See if there's room before making the label again
+            rect = QRectF(self.airport_rects[akey])
+            rect.translate(self.scene.width()/2 + point[0] - rect.width()/2,
+                           self.scene.height()/2 + point[1] - rect.height()/2)
+            if space_occupied.intersects(rect):
+                return None
         if akey in self.display_objects:
             ap = self.display_objects[akey]
         else:
@@ -389,20 +425,26 @@ class VirtualVfr(AI):
             ap.setBrush(QBrush(QColor(Qt.white)))
             ap.setZValue(0)
             self.display_objects[akey] = ap
+            self.airport_rects[akey] = ap.boundingRect()
         rect = ap.boundingRect()
-        xoff = self.scene.width()/2 + point[0] - rect.width()/2
-        ap.setX(xoff)
-        yoff = self.scene.height()/2 + point[1] - rect.height()/2
-        ap.setY(yoff)
+        if self.moved(akey, [point]):
+            xoff = self.scene.width()/2 + point[0] - rect.width()/2
+            ap.setX(xoff)
+            yoff = self.scene.height()/2 + point[1] - rect.height()/2
+            ap.setY(yoff)
+            self.drawn[akey] = [point]
+        else:
+            xoff = ap.x()
+            yoff = ap.y()
         rect.translate(xoff,yoff)
-        for s in space_occupied:
-            if s.intersects(rect):
-                self.eliminate_airport(airport_id)
-                return None
+        if space_occupied.intersects(rect):
+            self.eliminate_airport(airport_id)
+            return None
         return rect
 
     def eliminate_airport(self, airport_id):
         akey = airport_id
+        self.drawn.pop(akey, None)
         if akey in self.display_objects:
             ap = self.display_objects[akey]
             self.scene.removeItem(ap)
@@ -446,38 +488,74 @@ class VirtualVfr(AI):
 
     def setLatitude(self, lat):
         self.lat = lat
+        if self.missing_lat:
+            # First real fix, don't wait for the cache refresh period
+            self.pov.last_cache_time = None
         self.missing_lat = False
         #print ("New latitude %f"%self.lat)
-        self.pov.update_position (self.lat, self.lng)
-        if not self.rendering_prohibited:
-            self.pov.render(self)
+        self.position_changed = True
+        gui.scheduleRedraw(self, self.update_view)
 
     def setLongitude(self, lng):
         self.lng = lng
+        if self.missing_lng:
+            # First real fix, don't wait for the cache refresh period
+            self.pov.last_cache_time = None
         self.missing_lng = False
         #print ("New longitude %f"%self.lng)
-        self.pov.update_position (self.lat, self.lng)
-        if not self.rendering_prohibited:
-            self.pov.render(self)
+        self.position_changed = True
+        gui.scheduleRedraw(self, self.update_view)
 
     def setAltitude(self, alt):
         self.altitude = alt
         self.pov.update_altitude (alt)
 
     def setHeading(self, heading):
-        curtime = time.time()
-        if curtime - self.last_mag_update > 60 or self.magnetic_declination is None:
-            # update every minute at the most
-            if not (self.missing_lat or self.missing_lng):
-                self.last_mag_update = curtime
-                self.magnetic_declination = declination (self.lat, self.lng, self.altitude)
-        md = self.magnetic_declination
-        if md is None:
-            md = 0
-        self.pov.update_heading (heading + md)
+        self.heading = heading
+        self.heading_changed = True
+        gui.scheduleRedraw(self, self.update_view)
+
+    def blocks_loaded(self):
+        self.position_changed = True
+        gui.scheduleRedraw(self, self.update_view)
+
+    # Position and heading changes are collected and applied to the point
+    # of view once per frame.
+    def update_view(self):
+        if self.position_changed:
+            self.position_changed = False
+            self.pov.update_position (self.lat, self.lng)
+        if self.heading_changed:
+            self.heading_changed = False
+            curtime = time.time()
+            if curtime - self.last_mag_update > 60 or self.magnetic_declination is None:
+                # update every minute at the most
+                if not (self.missing_lat or self.missing_lng):
+                    self.last_mag_update = curtime
+                    self.magnetic_declination = declination (self.lat, self.lng, self.altitude)
+            md = self.magnetic_declination
+            if md is None:
+                md = 0
+            self.pov.update_heading (self.heading + md)
         if not self.rendering_prohibited:
             self.pov.render(self)
 
+    def resync(self):
+        super(VirtualVfr, self).resync()
+        if self.pov is None:
+            return
+        self.lat = self.lat_item.value
+        self.lng = self.lng_item.value
+        self.heading = self.head_item.value
+        self.setAltitude(self.alt_item.value)
+        self.setBlank(None)
+        self.position_changed = True
+        self.heading_changed = True
+        # Force the view screen to be rebuilt for where we are now
+        self.pov.last_time = None
+        self.pov.last_cache_time = None
+        self.update_view()
+
     def setBlank(self, b):
         self.rendering_prohibited = \
             self.lng_item.fail or self.lng_item.bad or self.lng_item.old or \
@@ -488,12 +566,128 @@ class VirtualVfr(AI):
             for key in self.display_objects.keys():
                 self.scene.removeItem(self.display_objects[key])
             self.display_objects = dict()
+            self.drawn = dict()
+            self.papi_drawn = dict()
+
+# Runway label font sizes for each font family
+font_tables = dict()
+
+def font_size_table(family, chart_cache=None):
+    if not family in font_tables:
+        filename = None
+        if chart_cache is not None and chart_cache.stamp is not None:
+            filename = os.path.join(chart_cache.cache_path, "fontsizes.json")
+        font_tables[family] = FontSizeTable(family, filename)
+    return font_tables[family]
+
+class FontSizeTable:
+    """ The largest runway label font size that fits each width in pixels.
+        The label width at each font size is only measured once and is kept
+        in a file for the next run.
+    """
+    def __init__(self, family, filename=None):
+        self.family = family
+        self.filename = filename
+        self.widths = dict()
+        self.table = list()
+        self.changed = False
+        if filename is not None:
+            try:
+                with open(filename) as f:
+                    saved = json.load(f).get(family, {})
+                self.widths = {float(size):width for size,width in saved.items()}
+            except (OSError, ValueError, AttributeError):
+                pass
+
+    def label_width(self, size):
+        try:
+            return self.widths[size]
+        except KeyError:
+            t = QGraphicsSimpleTextItem ("9 9")
+            t.setFont (QFont(self.family, int(size), QFont.Bold))
+            self.widths[size] = t.boundingRect().width()
+            self.changed = True
+            return self.widths[size]
+
+    def search(self, width):
+        max_size = 25
+        min_size = VirtualVfr.MIN_FONT_SIZE
+        incr = (max_size - min_size) / 4
+        ret = (max_size - min_size) / 2
+        while True:
+            if self.label_width(ret) * 1.5 > width:
+                max_size = ret
+                ret -= incr
+                if ret < min_size:
+                    ret = min_size
+                    break
+            else:
+                break
+        incr = int((max_size - min_size) / 2)
+        while incr > 0:
+            ret += incr
+            if self.label_width(ret) * 1.1 > width:
+                ret -= incr
+                incr /= 2
+                incr = int(incr)
+        return ret
+
+    def build(self, max_width):
+        """ Fill in the table for every whole pixel width up to max_width """
+        size = self.search(len(self.table))
+        while len(self.table) <= max_width:
+            width = len(self.table)
+            next_size = self.search(width + 1)
+            # Only whole pixels where the size doesn't change go in the table
+            self.table.append(size if size == next_size else None)
+            size = next_size
+        if self.changed and self.filename is not None:
+            self.save()
+
+    def lookup(self, width):
+        size = None
+        if 0 <= width < len(self.table):
+            size = self.table[int(width)]
+        if size is None:
+            return self.search(width)
+        return size
+
+    def save(self):
+        try:
+            try:
+                with open(self.filename) as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                saved = dict()
+            saved[self.family] = {str(int(size)):width for size,width in self.widths.items()}
+            with open(self.filename, 'w') as f:
+                json.dump(saved, f)
+            self.changed = False
+        except (OSError, TypeError) as e:
+            log.warning("Unable to save font sizes: {0}".format(e))
 
 VIEWPORT_ANGLE100 = 35.0 / 2.0 * RAD_DEG
 
+# Chart blocks are read from the database by a single background thread so
+# that crossing a block boundary doesn't stall the display.
+loader = None
+
+def load_block(chart_cache, block, done=None):
+    global loader
+    if loader is None:
+        loader = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    future = loader.submit(chart_cache.find_objects, block[0], block[1])
+    if done is not None:
+        future.add_done_callback(lambda f: done())
+    return future
+
 class PointOfView:
     sorted_object_types = ["Airport", "Fix"]
-    def __init__(self, dbpath, index_path, refresh_period):
+    # Objects more than this many nautical miles behind us aren't rendered.
+    # The margin keeps those nearly underneath us that are still on the screen.
+    CULL_MARGIN = 1.0
+    def __init__(self, dbpath, index_path, refresh_period, blocks_loaded=None,
+                 cache_path=None):
         # Inputs
         self.altitude = 0
         self.gps_lat = 0
@@ -504,16 +698,33 @@ class PointOfView:
         self.display_width = 0
         self.index_path = index_path
         self.dbpath = dbpath
+        self.chart_cache = BlockCache(dbpath, index_path, cache_path)
         self.refresh_period = .1 if refresh_period is None else refresh_period
         self.cache_refresh_period = self.refresh_period * 100
+        # Called from the loader thread when blocks are ready
+        self.blocks_loaded = blocks_loaded
 
         # Computed State
         self.view_screen = None
         self.object_cache = dict()
+        self.loading = dict()
+        self.prefetched = dict()
+        # Time that each block which couldn't be loaded last failed
+        self.failed = dict()
+        # Spatial indexes of the cached runways and of the objects that are
+        # rendered nearest first
+        self.runway_index = KDTree([])
+        self.sorted_order = dict()
+        # Runway corner positions, they don't change
+        self.corners = dict()
         self.elevation = 0
         self.last_time = None
         self.last_cache_time = None
         self.do_render = False
+        # Screen points projected ahead of rendering
+        self.projected = dict()
+        # The objects rendered last time, by id
+        self.shown = dict()
 
     def initialize(self, show_what, display_width, lng, lat, alt, head):
         self.display_width = display_width
@@ -618,120 +829,285 @@ class PointOfView:
         #print ("new view screen %s"%str(self.view_screen))
 
     def update_cache(self):
-        if self.last_cache_time is not None and \
+        arrived = self.collect_blocks()
+        if (not arrived) and self.last_cache_time is not None and \
                 (time.time() - self.last_cache_time < self.cache_refresh_period):
             return
-        center_lat = int(self.gps_lat)
-        center_lng = int(self.gps_lng)
-        for lat_inc in range(-1,2,1):
-            for lng_inc in range(-1,2,1):
-                block = (center_lat + lat_inc, center_lng + lng_inc)
-                if not block in self.object_cache:
-                    self.object_cache[block] = CIFPObjects.find_objects(
-                                    self.dbpath, self.index_path, block[0], block[1])
+        missing = list()
+        for block in self.blocks_around(self.gps_lat, self.gps_lng):
+            if not (block in self.object_cache or block in self.prefetched or
+                    self.retry_later(block)):
+                missing.append(block)
+                if not block in self.loading:
+                    self.loading[block] = load_block(self.chart_cache, block,
+                                                     self.blocks_loaded)
+        # Runways can be matched across blocks so the new blocks are only
+        # swapped in once all of them are here.  A block that failed to
+        # load doesn't hold up the others.
+        added = False
+        if len(missing) == 0:
+            for block in self.blocks_around(self.gps_lat, self.gps_lng):
+                if not block in self.object_cache and block in self.prefetched:
+                    self.object_cache[block] = self.prefetched.pop(block)
+                    added = True
                     #print ("New cache block has %d objects at %f,%f"%(len(self.object_cache[block]), self.gps_lat, self.gps_lng))
-        # Match runways
+        for block in self.blocks_ahead():
+            if not (block in self.object_cache or block in self.prefetched or
+                    block in self.loading or self.retry_later(block)):
+                self.loading[block] = load_block(self.chart_cache, block,
+                                                 self.blocks_loaded)
         self.last_cache_time = time.time()
-        while True:
-            rwsearch = None
-            rwsearchblock = None
-            rwsearchnum = -1
-            rwdelete = -1
-            rwdeleteblock = None
-            for block,olist in self.object_cache.items():
-                for i,o in enumerate(olist):
-                    if isinstance(o, CIFPObjects.Runway) and (not o.matched()):
-                        if rwsearch is None:
-                            rwsearch = o
-                            rwsearchblock = block
-                            rwsearchnum = i
-                            #print ("Search match for %s"%str(o))
-                        else:
-                            if rwsearch.match(o):
-                                rwdelete = i
-                                rwdeleteblock = block
-                                rwsearch = None
-                                break
-                            else:
-                                #print ("Mis match for %s"%str(o))
-                                pass
-                if rwdeleteblock is not None:
+        if added:
+            self.match_runways()
+            self.do_render = True
+        if self.garbage_collect_cache() or added:
+            self.index_cache()
+
+    def collect_blocks(self):
+        """ Move blocks the loader has finished with to the prefetched list
+        """
+        done = [block for block,future in self.loading.items() if future.done()]
+        for block in done:
+            future = self.loading.pop(block)
+            if future.cancelled():
+                continue
+            try:
+                self.prefetched[block] = future.result()
+                self.failed.pop(block, None)
+            except Exception as e:
+                log.error("Unable to load chart block {0},{1}: {2}".format(
+                          block[0], block[1], e))
+                self.failed[block] = time.time()
+        return len(done) > 0
+
+    def retry_later(self, block):
+        """ True if the block failed to load too recently to try it again
+        """
+        failed = self.failed.get(block)
+        return failed is not None and \
+               time.time() - failed < self.cache_refresh_period
+
+    def blocks_around(self, lat, lng):
+        center_lat = int(lat)
+        center_lng = int(lng)
+        blocks = list()
+        for lat_inc in range(-1,2,1):
+            for lng_inc in range(-1,2,1):
+                blocks.append((center_lat + lat_inc, center_lng + lng_inc))
+        return blocks
+
+    def blocks_ahead(self):
+        """ The blocks that will be needed once we fly into the next block
+            along our heading
+        """
+        hrad = self.true_heading * RAD_DEG
+        dlat = round(math.cos(hrad))
+        dlng = round(math.sin(hrad))
+        current = self.blocks_around(self.gps_lat, self.gps_lng)
+        return [block for block in
+                    self.blocks_around(self.gps_lat + dlat, self.gps_lng + dlng)
+                    if not block in current]
+
+    def match_runways(self):
+        """ Pair up the two ends of each runway.  The first end found keeps the
+            other as its opposing runway and the other end is dropped, as is
+            any end that can't be paired.
+        """
+        unmatched = list()
+        ends = dict()
+        for olist in self.object_cache.values():
+            for o in olist:
+                if isinstance(o, CIFPObjects.Runway) and (not o.matched()):
+                    unmatched.append(o)
+                    key = (o.airport_id, runway_number(o.name))
+                    if key in ends:
+                        ends[key].append(o)
+                    else:
+                        ends[key] = [o]
+        dropped = set()
+        for rwsearch in unmatched:
+            if id(rwsearch) in dropped:
+                continue
+            rwnum = runway_number(rwsearch.name) + 18
+            if rwnum > 36:
+                rwnum -= 36
+            for o in ends.get((rwsearch.airport_id, rwnum), []):
+                if o is not rwsearch and (not o.matched()) and \
+                        (not id(o) in dropped) and rwsearch.match(o):
+                    dropped.add(id(o))
                     break
-            if rwdeleteblock is not None:
-                del self.object_cache[rwdeleteblock][rwdelete]
             else:
-                if rwsearch is None:
-                    break
-                else:
-                    log.debug ("Unable to find match for %s"%str(rwsearch))
-                    del self.object_cache[rwsearchblock][rwsearchnum]
-        self.garbage_collect_cache()
-
+                log.debug ("Unable to find match for %s"%str(rwsearch))
+                dropped.add(id(rwsearch))
+        if len(dropped) > 0:
+            for olist in self.object_cache.values():
+                olist[:] = [o for o in olist if not id(o) in dropped]
 
     def garbage_collect_cache(self):
-        center_lat = int(self.gps_lat)
-        center_lng = int(self.gps_lng)
-        keeplist = list()
-        for lat_inc in range(-1,2,1):
-            for lng_inc in range(-1,2,1):
-                block = (center_lat + lat_inc, center_lng + lng_inc)
-                keeplist.append(block)
+        keeplist = self.blocks_around(self.gps_lat, self.gps_lng)
+        aheadlist = self.blocks_ahead()
         purge_list = list()
         for cacheline in self.object_cache.keys():
             if not cacheline in keeplist:
                 purge_list.append(cacheline)
         for p in purge_list:
             del self.object_cache[p]
+        for cacheline in list(self.prefetched.keys()):
+            if not (cacheline in keeplist or cacheline in aheadlist):
+                del self.prefetched[cacheline]
+        for cacheline in list(self.loading.keys()):
+            if not (cacheline in keeplist or cacheline in aheadlist):
+                # Only stops it if the loader hasn't started on it yet
+                if self.loading[cacheline].cancel():
+                    del self.loading[cacheline]
+        return len(purge_list) > 0
+
+    def index_cache(self):
+        runways = list()
+        sorted_objects = list()
+        for object_list in self.object_cache.values():
+            for obj in object_list:
+                if isinstance(obj, CIFPObjects.Runway):
+                    runways.append(obj)
+                if obj.typestr() in self.sorted_object_types:
+                    sorted_objects.append(obj)
+        self.runway_index = KDTree([(o.lng,o.lat) for o in runways], runways)
+        self.sorted_order = {id(o):i for i,o in enumerate(sorted_objects)}
+        self.corners = dict()
 
     def approximate_elevation(self):
         """ Find the approximate elevation of the land beneath the aircraft by
             finding the elevation of the nearest runway
         """
-        NOMIN = 99999999
-        min_distance = NOMIN
-        elevation = 0
-        rel_lng = 0
-        curpos = (self.gps_lng,self.gps_lat)
-        for object_list in self.object_cache.values():
-            for obj in object_list:
-                if isinstance(obj, CIFPObjects.Runway):
-                    course = [curpos, (obj.lng,obj.lat)]
-                    distance, rel_lng = \
-                            Distance(course, rel_lng=rel_lng)
-                    if distance < min_distance:
-                        min_distance = distance
-                        elevation = obj.elevation
-        return elevation
+        rel_lng = GetRelLng(self.gps_lat * M_PI / 180.0)
+        nearest = self.runway_index.nearest((self.gps_lng,self.gps_lat),
+                                            (rel_lng, 1.0))
+        if nearest is None:
+            return 0
+        return nearest[1].elevation
 
     def render(self, display_object):
         if not self.do_render:
             return
-        sorted_objects = list()
-        for oblist in self.object_cache.values():
-            for ob in oblist:
-                if ob.typestr() in self.show_object_types:
-                    if ob.typestr() in self.sorted_object_types:
-                        sorted_objects.append (ob)
-                    else:
-                        ob.render (self, display_object, self.display_width,
-                                    (self.gps_lng, self.gps_lat))
+        visible = self.project_objects()
+        shown = dict()
+        for ob in visible:
+            shown[id(ob)] = ob
+        # Only what was on the screen last time has to be taken down
+        for key,ob in self.shown.items():
+            if not key in shown:
+                eliminate(ob, display_object)
+        self.shown = shown
+
         rel_lng = GetRelLng(self.gps_lat)
-        sorted_objects = [(Distance( [(self.gps_lng, self.gps_lat), (so.lng,so.lat)],
-                                    rel_lng)[0], so) for so in sorted_objects]
+        sorted_objects = list()
+        for ob in visible:
+            if ob.typestr() in self.sorted_object_types:
+                sorted_objects.append((Distance( [(self.gps_lng, self.gps_lat),
+                                      (ob.lng,ob.lat)], rel_lng)[0],
+                                      self.sorted_order[id(ob)], ob))
+            else:
+                ob.render (self, display_object, self.display_width,
+                            (self.gps_lng, self.gps_lat))
         sorted_objects.sort()
-        space_occupied = list()
-        for d,so in sorted_objects:
+        space_occupied = SpaceOccupied()
+        for d,i,so in sorted_objects:
             rect = so.render (self, display_object, self.display_width,
                                     (self.gps_lng, self.gps_lat), space_occupied)
             if rect is not None:
                 space_occupied.append(rect)
 
+        self.projected = dict()
         self.do_render = False
 
+    def project_objects(self):
+        """ Project every point that the objects will ask point2D() for while
+            rendering in one pass.  Returns the objects that might be on the
+            screen, the rest would only take themselves down.
+        """
+        hrad = self.true_heading * RAD_DEG
+        forward_lat = math.cos(hrad)
+        forward_lng = math.sin(hrad) * GetRelLng(self.gps_lat * RAD_DEG)
+        candidates = list()
+        for oblist in self.object_cache.values():
+            for ob in oblist:
+                if ob.typestr() in self.show_object_types:
+                    # Skip anything behind us before projecting it
+                    ahead = ((ob.lat - self.gps_lat) * forward_lat +
+                             (ob.lng - self.gps_lng) * forward_lng) * 60.0
+                    if ahead >= -self.CULL_MARGIN:
+                        candidates.append(ob)
+        self.projected = self.project_points([(ob.lat, ob.lng) for ob in candidates])
+        visible = list()
+        points = list()
+        for ob in candidates:
+            p = self.projected[(ob.lat, ob.lng)]
+            if p is None or abs(p[0]) > self.display_width or \
+                    abs(p[1]) > self.display_width:
+                continue
+            visible.append(ob)
+            # The other end and corners of the runways near the screen
+            if isinstance(ob, CIFPObjects.Runway) and ob.matched():
+                points.append((ob.opposing_rw.lat, ob.opposing_rw.lng))
+                try:
+                    points.extend(self.corners[id(ob)])
+                except KeyError:
+                    self.corners[id(ob)] = runway_corners(ob)
+                    points.extend(self.corners[id(ob)])
+        self.projected.update(self.project_points(points))
+        return visible
+
+    def project_points(self, points):
+        """ Returns a dictionary of the point2D() result for each (lat, lng)
+            in points
+        """
+        if numpy is None or len(points) == 0:
+            return {(lat, lng): self.point2D(lat, lng) for lat,lng in points}
+        lats, lngs = zip(*points)
+        xs, ys = self.project(lats, lngs)
+        result = dict()
+        for point, x, y in zip(points, xs.tolist(), ys.tolist()):
+            result[point] = None if math.isnan(x) else (x, y)
+        return result
+
+    def project(self, lats, lngs):
+        """ point2D() for arrays of latitudes and longitudes.  Returns arrays
+            of the screen x and y with NaN wherever point2D() returns None
+        """
+        point_radius = EARTH_RADIUS + self.elevation
+        theta = numpy.asarray(lngs, dtype=float) * RAD_DEG
+        phi = numpy.asarray(lats, dtype=float) * RAD_DEG
+        cos_phi = numpy.cos(phi)
+        positions = numpy.empty((len(theta), 3))
+        positions[:,0] = point_radius * numpy.cos(theta) * cos_phi
+        positions[:,1] = point_radius * numpy.sin(theta) * cos_phi
+        positions[:,2] = point_radius * numpy.sin(phi)
+
+        screen = self.view_screen
+        org = numpy.array(vector3(self.pov_position))
+        normal = numpy.array(vector3(screen.plane.normal))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            # Rays from the pilot through each point
+            rays = positions - org
+            rays /= numpy.sqrt((rays * rays).sum(axis=1))[:,numpy.newaxis]
+            # and where they cross the view screen
+            t = (screen.plane.c - normal.dot(org)) / rays.dot(normal)
+            onscreen = t >= 0
+            crossings = org + t[:,numpy.newaxis] * rays
+            crossings -= numpy.array(vector3(screen.x.org))
+            x = crossings.dot(numpy.array(vector3(screen.x.dir)))
+            y = crossings.dot(numpy.array(vector3(screen.y.dir)))
+        onscreen &= numpy.isfinite(x) & numpy.isfinite(y)
+        x[~onscreen] = numpy.nan
+        y[~onscreen] = numpy.nan
+        return x, y
+
     def point2D (self, lat, lng, debug=False):
         """ Find the projected point on the view screen given a latitude and longitude
             of the point.
         """
+        if (lat, lng) in self.projected:
+            return self.projected[(lat, lng)]
         point_radius = EARTH_RADIUS + self.elevation
         point_polar = Spatial.Polar (lng * RAD_DEG, lat * RAD_DEG, point_radius)
         point_position = point_polar.to3()
@@ -788,6 +1164,77 @@ def F(var, function):
     else:
         return slope * var + intercept
 
+class SpaceOccupied:
+    """ The screen rectangles taken by labels so far, kept in a grid so that
+        a new label is only checked against the ones near it
+    """
+    CELL_SIZE = 32
+    def __init__(self):
+        self.rects = list()
+        self.cells = dict()
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __iter__(self):
+        return iter(self.rects)
+
+    def cells_under(self, rect):
+        x1 = int(math.floor(rect.left() / self.CELL_SIZE))
+        x2 = int(math.floor(rect.right() / self.CELL_SIZE))
+        y1 = int(math.floor(rect.top() / self.CELL_SIZE))
+        y2 = int(math.floor(rect.bottom() / self.CELL_SIZE))
+        for x in range(x1, x2+1):
+            for y in range(y1, y2+1):
+                yield (x,y)
+
+    def append(self, rect):
+        self.rects.append(rect)
+        for cell in self.cells_under(rect):
+            if cell in self.cells:
+                self.cells[cell].append(rect)
+            else:
+                self.cells[cell] = [rect]
+
+    def intersects(self, rect):
+        for cell in self.cells_under(rect):
+            for s in self.cells.get(cell, ()):
+                if s.intersects(rect):
+                    return True
+        return False
+
+def eliminate(ob, display_object):
+    if isinstance(ob, CIFPObjects.Runway):
+        display_object.eliminate_runway (ob.name, ob.airport_id)
+    elif isinstance(ob, CIFPObjects.Airport):
+        display_object.eliminate_airport (ob.id)
+    elif isinstance(ob, CIFPObjects.Navaid):
+        display_object.eliminate_navaid (ob.id)
+
+def vector3(p):
+    return (p.x, p.y, p.z)
+
+def runway_corners(rw):
+    """ The points Runway.render() draws the runway polygon with
+    """
+    width_2 = rw.length * CIFPObjects.Runway.WIDTH_RATIO / 2
+    width_2_nm = width_2 * CIFPObjects.NM_FEET
+    centerpoint = (rw.lng, rw.lat)
+    otherpoint = (rw.opposing_rw.lng, rw.opposing_rw.lat)
+    corners = list()
+    for width_bearing in [rw.bearing + 90, rw.bearing - 90]:
+        if width_bearing >= 360:
+            width_bearing -= 360
+        if width_bearing <= -360:
+            width_bearing += 360
+        for position in [centerpoint, otherpoint]:
+            lng,lat = CIFPObjects.AddPosition(position, width_2_nm, width_bearing)
+            corners.append((lat, lng))
+    return corners
+
+def runway_number(name):
+    return int(''.join([d for d in name if d >= '0' and d <= '9']))
+
 def get_polar_deltas(course):
     lng1,lat1 = course[0]
     lng2,lat2 = course[1]
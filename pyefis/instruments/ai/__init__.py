@@ -24,6 +24,8 @@ import logging
 
 import pyavtools.fix as fix
 from pyefis import common
+from pyefis import gui
+from pyefis import hub
 
 log = logging.getLogger(__name__)
 
@@ -61,6 +63,11 @@ class AI(QGraphicsView):
         self.drawBankMarkers = True
         self.bankAngleRadius = None # Radius of the bank angle markings
         self.bankAngleMaximum = 25  # Largest bank angle that will be indicated
+        # "scene" moves the whole QGraphicsScene around on every update.
+        # "pixmap" draws the horizon and pitch ladder into pixmaps once and
+        # then just blits them rotated.  If left as None the screen
+        # configuration item ai_render_mode is used.
+        self.renderMode = None
 
         self.setStyleSheet("border: 0px")
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
@@ -69,13 +76,13 @@ class AI(QGraphicsView):
         self.setFocusPolicy(Qt.NoFocus)
 
         pitch = fix.db.get_item("PITCH")
-        pitch.valueChanged[float].connect(self.setPitchAngle)
+        hub.subscribe("PITCH", self.setPitchAngle)
         pitch.oldChanged[bool].connect(self.setAIOld)
         pitch.badChanged[bool].connect(self.setAIBad)
         pitch.failChanged[bool].connect(self.setAIFail)
         self._pitchAngle = pitch.value
         roll = fix.db.get_item("ROLL")
-        roll.valueChanged[float].connect(self.setRollAngle)
+        hub.subscribe("ROLL", self.setRollAngle)
         roll.oldChanged[bool].connect(self.setAIOld)
         roll.badChanged[bool].connect(self.setAIBad)
         roll.failChanged[bool].connect(self.setAIFail)
@@ -84,16 +91,22 @@ class AI(QGraphicsView):
         self._AIBad = roll.bad
         self._AIFail = roll.fail
         alat = fix.db.get_item("ALAT")
-        alat.valueChanged[float].connect(self.setLateralAcceleration)
+        hub.subscribe("ALAT", self.setLateralAcceleration)
         self._latAccel = alat.value
         tas = fix.db.get_item("TAS")
-        tas.valueChanged[float].connect(self.setTrueAirspeed)
+        hub.subscribe("TAS", self.setTrueAirspeed)
         self._tas = tas.value
         # We store all the pitch tick marks and text in a list so that
         # we can adjust the opacity of the items.
         self.pitchItems = []
 
     def resizeEvent(self, event):
+        if self.renderMode is None:
+            mode = None
+            if hasattr(self.myparent, "get_config_item"):
+                mode = self.myparent.get_config_item('ai_render_mode')
+            self.renderMode = "scene" if mode is None else mode
+        self.pitchItems = []
         #Setup the scene that we use for the background of the AI
         sceneHeight = self.height() * 4.5
         sceneWidth = math.sqrt(self.width() * self.width() +
@@ -154,7 +167,7 @@ class AI(QGraphicsView):
         #Draw the main horizontal line
         pen = QPen(QColor(Qt.white))
         pen.setWidth(2)
-        self.scene.addLine(0, sceneHeight / 2, sceneWidth, sceneHeight / 2, pen)
+        self.horizonLine = self.scene.addLine(0, sceneHeight / 2, sceneWidth, sceneHeight / 2, pen)
         # draw the degree hash marks
         pen.setColor(Qt.white)
         w = self.scene.width()
@@ -208,6 +221,8 @@ class AI(QGraphicsView):
                 l.setZValue(1)
                 self.pitchItems.append((i, l))
         self.setPitchItems()
+        if self.renderMode == "pixmap":
+            self.renderAtlas()
 
         # Draws the static overlay stuff to a pixmap
         self.map = QPixmap(self.width(), self.height())
@@ -244,13 +259,99 @@ class AI(QGraphicsView):
     # and the second is the item reference.  We use this to make the tick marks
     # disappear when they are a certain distance from the current pitch angle
     def setPitchItems(self):
+        # In pixmap mode the ladder is clipped when it is drawn instead
+        if self.renderMode == "pixmap":
+            return
         for each in self.pitchItems:
             if abs(each[0] - self._pitchAngle) < self.visiblePitchAngle:
                 each[1].setOpacity(self.pitchOpacity)
             else:
                 each[1].setOpacity(0)
 
+    # Rasterize the scene for the pixmap render mode.  The background has
+    # the sky, the ground and the horizon line.  The ladder atlas has one row
+    # for each pitch angle that has marks so that marks can be turned on and
+    # off whole, the same way setPitchItems() does it for the scene.
+    def renderAtlas(self):
+        sw = self.scene.width()
+        sh = self.scene.height()
+        for angle, item in self.pitchItems:
+            item.hide()
+        self.background = QPixmap(int(math.ceil(sw)), int(math.ceil(sh)))
+        self.background.fill(Qt.black)
+        p = QPainter(self.background)
+        p.setRenderHint(QPainter.Antialiasing)
+        self.scene.render(p, QRectF(0, 0, sw, sh), self.scene.sceneRect())
+        p.end()
+
+        angles = {}
+        x0 = sw
+        x1 = 0
+        half = 0
+        for angle, item in self.pitchItems:
+            angles.setdefault(angle, []).append(item)
+            r = item.sceneBoundingRect()
+            y = sh / 2 - self.pixelsPerDeg * angle
+            x0 = min(x0, r.left())
+            x1 = max(x1, r.right())
+            half = max(half, y - r.top(), r.bottom() - y)
+        self.ladderLeft = int(math.floor(x0)) - 1
+        ladderWidth = int(math.ceil(x1)) + 1 - self.ladderLeft
+        self.rowHeight = int(math.ceil(2 * half)) + 2
+        self.ladderRows = {}
+        self.sky_rect.hide()
+        self.land_rect.hide()
+        self.horizonLine.hide()
+        self.ladder = QPixmap(max(1, ladderWidth), max(1, self.rowHeight * len(angles)))
+        self.ladder.fill(Qt.transparent)
+        p = QPainter(self.ladder)
+        p.setRenderHint(QPainter.Antialiasing)
+        for row, angle in enumerate(sorted(angles)):
+            top = self.rowTop(angle)
+            self.ladderRows[angle] = row
+            for item in angles[angle]:
+                item.setOpacity(self.pitchOpacity)
+                item.show()
+            self.scene.render(p, QRectF(0, row * self.rowHeight, ladderWidth, self.rowHeight),
+                              QRectF(self.ladderLeft, top, ladderWidth, self.rowHeight))
+            for item in angles[angle]:
+                item.hide()
+        p.end()
+        self.sky_rect.show()
+        self.land_rect.show()
+        self.horizonLine.show()
+        for angle, item in self.pitchItems:
+            item.show()
+        bandHeight = self.rowHeight + int(math.ceil(2 * self.visiblePitchAngle * self.pixelsPerDeg)) + 2
+        self.band = QPixmap(max(1, ladderWidth), bandHeight)
+        self.bandRange = None
+
+    # Top of the atlas row for a pitch angle in scene coordinates.  It's
+    # kept on a whole pixel so the rows line up with the background.
+    def rowTop(self, angle):
+        y = self.scene.height() / 2 - self.pixelsPerDeg * angle
+        return int(math.floor(y - self.rowHeight / 2))
+
+    # Put together the ladder marks between lo and hi degrees.  This only
+    # has to be done when the pitch crosses a whole degree.
+    def renderBand(self, lo, hi):
+        self.bandRange = (lo, hi)
+        self.bandTop = self.rowTop(hi)
+        self.band.fill(Qt.transparent)
+        p = QPainter(self.band)
+        w = self.ladder.width()
+        for angle in range(lo, hi + 1):
+            row = self.ladderRows.get(angle)
+            if row is None:
+                continue
+            p.drawPixmap(QPointF(0, self.rowTop(angle) - self.bandTop), self.ladder,
+                         QRectF(0, row * self.rowHeight, w, self.rowHeight))
+        p.end()
+
     def redraw(self):
+        if self.renderMode == "pixmap":
+            self.viewport().update()
+            return
         self.resetTransform()
         self.centerOn(self.scene.width() / 2,
                       self.scene.height() / 2 +
@@ -259,7 +360,10 @@ class AI(QGraphicsView):
 
 # We use the paintEvent to draw on the viewport the parts that aren't moving.
     def paintEvent(self, event):
-        super(AI, self).paintEvent(event)
+        if self.renderMode == "pixmap" and not self._AIFail:
+            self.paintAtlas()
+        else:
+            super(AI, self).paintEvent(event)
         w = self.width()
         h = self.height()
         r = self.bankAngleRadius
@@ -322,6 +426,28 @@ class AI(QGraphicsView):
             p.rotate(-2 * a)
             p.drawPolygon(diamond)
 
+    # Draw the horizon for the pixmap render mode.  This puts the pixmaps
+    # in the same place that the view would put the scene.
+    def paintAtlas(self):
+        sw = self.background.width()
+        center = self.scene.height() / 2 - self._pitchAngle * self.pixelsPerDeg
+        # Marks less than visiblePitchAngle away from the pitch are shown
+        lo = int(math.floor(self._pitchAngle - self.visiblePitchAngle)) + 1
+        hi = int(math.ceil(self._pitchAngle + self.visiblePitchAngle)) - 1
+        if self.bandRange != (lo, hi):
+            self.renderBand(lo, hi)
+        p = QPainter(self.viewport())
+        p.setRenderHint(QPainter.SmoothPixmapTransform)
+        p.translate(self.width() / 2, self.height() / 2)
+        p.rotate(self._rollAngle * -1.0)
+        p.translate(-sw / 2, -center)
+        # The scene is as wide as the view's diagonal so nothing further
+        # than that from the center can ever be seen.
+        source = QRectF(0, center - sw / 2, sw, sw)
+        p.drawPixmap(source, self.background, source)
+        p.drawPixmap(QPointF(self.ladderLeft, self.bandTop), self.band)
+        p.end()
+
     # We don't want this responding to keystrokes
     def keyPressEvent(self, event):
         pass
@@ -331,9 +457,9 @@ class AI(QGraphicsView):
         pass
 
     def setRollAngle(self, angle):
-        if angle != self._rollAngle and self.isVisible() and (not self._AIFail):
+        if angle != self._rollAngle and (not self._AIFail):
             self._rollAngle = common.bounds(-180, 180, angle)
-            self.redraw()
+            gui.scheduleRedraw(self, self.redraw)
 
     def getRollAngle(self):
         return self._rollAngle
@@ -341,14 +467,14 @@ class AI(QGraphicsView):
     rollAngle = property(getRollAngle, setRollAngle)
 
     def setLateralAcceleration(self, value):
-        if value != self._latAccel and self.isVisible():
+        if value != self._latAccel:
             self._latAccel = common.bounds(-0.3, 0.3, value)
-            self.update()
+            gui.scheduleRedraw(self)
 
     def setTrueAirspeed(self, value):
-        if value != self._tas and self.isVisible():
+        if value != self._tas:
             self._tas = value
-            self.update()
+            gui.scheduleRedraw(self)
 
 
     def setAIFail(self, fail):
@@ -376,7 +502,9 @@ class AI(QGraphicsView):
                     self.sky_rect.setBrush (self.gblue_brush)
                     self.land_rect.setBrush (self.gbrown_brush)
                     #self.old_text.hide()
-                    self.redraw()
+                if self.renderMode == "pixmap":
+                    self.renderAtlas()
+                self.redraw()
 
     def setAIBad(self, bad):
         log.debug("Set AI Bad")
@@ -391,19 +519,35 @@ class AI(QGraphicsView):
                     self.sky_rect.setBrush (self.gblue_brush)
                     self.land_rect.setBrush (self.gbrown_brush)
                     #self.bad_text.hide()
-                    self.redraw()
+                if self.renderMode == "pixmap":
+                    self.renderAtlas()
+                self.redraw()
 
     def setPitchAngle(self, angle):
-        if angle != self._pitchAngle and self.isVisible() and (not self._AIFail):
+        if angle != self._pitchAngle and (not self._AIFail):
             self._pitchAngle = common.bounds(-90, 90, angle)
-            self.setPitchItems()
-            self.redraw()
+            gui.scheduleRedraw(self, self.setPitchItems)
+            gui.scheduleRedraw(self, self.redraw)
 
     def getPitchAngle(self):
         return self._pitchAngle
 
     pitchAngle = property(getPitchAngle, setPitchAngle)
 
+    def resync(self):
+        roll = fix.db.get_item("ROLL")
+        self.setAIFail(roll.fail)
+        self.setAIOld(roll.old)
+        self.setAIBad(roll.bad)
+        self._pitchAngle = common.bounds(-90, 90, fix.db.get_item("PITCH").value)
+        self._rollAngle = common.bounds(-180, 180, roll.value)
+        self._latAccel = common.bounds(-0.3, 0.3, fix.db.get_item("ALAT").value)
+        self._tas = fix.db.get_item("TAS").value
+        if not self._AIFail:
+            self.setPitchItems()
+            self.redraw()
+        self.update()
+
 
 class FDTarget(QGraphicsView):
     def __init__(self, center, pixelsPerDeg, parent=None):
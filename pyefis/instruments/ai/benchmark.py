@@ -0,0 +1,77 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# Compares the frame times of the AI render modes.  Run it with
+#
+#   python -m pyefis.instruments.ai.benchmark
+#
+# It doesn't need a FIX Gateway server and runs offscreen unless
+# QT_QPA_PLATFORM says otherwise.
+
+import os
+import sys
+import math
+import time
+import argparse
+
+from PyQt5.QtCore import *
+from PyQt5.QtWidgets import *
+
+import pyavtools.fix as fix
+import pyefis.replay as replay
+
+
+def run(mode, width, height, frames):
+    from pyefis.instruments import ai
+    w = ai.AI()
+    w.renderMode = mode
+    w.resize(width, height)
+    w.show()
+    QApplication.processEvents()
+    times = []
+    for i in range(frames):
+        t = i / 30.0
+        start = time.perf_counter()
+        w.pitchAngle = 10 * math.sin(t)
+        w.rollAngle = 30 * math.sin(t * 0.7)
+        w.viewport().repaint()
+        times.append(time.perf_counter() - start)
+    w.close()
+    times.sort()
+    return {"mean": sum(times) / len(times),
+            "p50": times[len(times) // 2],
+            "p99": times[min(len(times) - 1, int(len(times) * 0.99))]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI render mode benchmark')
+    parser.add_argument('--frames', type=int, default=300,
+                        help='Number of frames to draw in each mode')
+    parser.add_argument('--width', type=int, default=800)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv[:1])
+    fix.db = replay.Database()
+    for mode in ["scene", "pixmap"]:
+        r = run(mode, args.width, args.height, args.frames)
+        print("{0:8} mean {1:7.3f} ms  p50 {2:7.3f} ms  p99 {3:7.3f} ms".format(
+              mode, r["mean"] * 1000, r["p50"] * 1000, r["p99"] * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# Keeps the chart objects of each 1x1 degree block that has been read from
+# the CIFP database in a binary file so that they don't have to be parsed
+# from the text records again.  Each file is stamped with the header record,
+# size and time of the database and the size and time of its index so a new
+# database cycle or a rebuilt index replaces them.
+
+import os
+import mmap
+import struct
+import hashlib
+import logging
+
+import pyavtools.CIFPObjects as CIFPObjects
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"PYEFISCB"
+FORMAT_VERSION = 1
+header = struct.Struct("<8sI20sI")
+# kind, id, runway, name, lat, lng, bearing, deviation, length, elevation
+record = struct.Struct("<1s4s5s30sddddii")
+
+
+def database_stamp(dbpath, index_path):
+    """ Identifies the database cycle and the index built from it.  The
+        first record of a CIFP file is its header which has the cycle in it.
+    """
+    with open(dbpath, 'rb') as f:
+        first = f.readline(256)
+    stamp = hashlib.sha1(first)
+    for path in (dbpath, index_path):
+        st = os.stat(path)
+        stamp.update(struct.pack("<qq", st.st_size, st.st_mtime_ns))
+    return stamp.digest()
+
+def text(b):
+    return b.rstrip(b'\0').decode('utf-8', 'ignore')
+
+def pack(o):
+    if isinstance(o, CIFPObjects.Runway):
+        return record.pack(b'R', o.airport_id.encode(), o.name.encode(), b'',
+                           o.lat, o.lng, o.bearing, 0.0, o.length, o.elevation)
+    elif isinstance(o, CIFPObjects.Airport):
+        return record.pack(b'A', o.id.encode(), b'', o.name.encode(),
+                           o.lat, o.lng, 0.0, 0.0, 0, 0)
+    elif isinstance(o, CIFPObjects.Navaid):
+        return record.pack(b'N', o.id.encode(), b'', o.name.encode(),
+                           o.lat, o.lng, 0.0, o.deviation, 0, 0)
+    return None
+
+def unpack(fields):
+    kind, ident, runway, name, lat, lng, bearing, deviation, length, elevation = fields
+    if kind == b'R':
+        o = CIFPObjects.Runway()
+        o.airport_id = text(ident)
+        o.name = text(runway)
+        o.bearing = bearing
+        o.length = length
+        o.elevation = elevation
+    elif kind == b'A':
+        o = CIFPObjects.Airport()
+        o.id = text(ident)
+        o.name = text(name)
+    else:
+        o = CIFPObjects.Navaid()
+        o.id = text(ident)
+        o.name = text(name)
+        o.deviation = deviation
+    o.lat = lat
+    o.lng = lng
+    return o
+
+
+class BlockCache(object):
+    def __init__(self, dbpath, index_path, cache_path=None):
+        self.dbpath = dbpath
+        self.index_path = index_path
+        if cache_path is None and index_path is not None:
+            cache_path = index_path + ".cache"
+        self.cache_path = cache_path
+        self.stamp = None
+        self.hits = 0
+        self.misses = 0
+        if self.cache_path is not None:
+            try:
+                self.stamp = database_stamp(dbpath, index_path)
+                os.makedirs(self.cache_path, exist_ok=True)
+            except (OSError, TypeError) as e:
+                log.warning("Chart block cache disabled: {0}".format(e))
+                self.stamp = None
+
+    def filename(self, lat, lng):
+        return os.path.join(self.cache_path, "{0}_{1}.bin".format(lat, lng))
+
+    def find_objects(self, lat, lng):
+        """ Same as CIFPObjects.find_objects() for this database """
+        if self.stamp is None:
+            return CIFPObjects.find_objects(self.dbpath, self.index_path, lat, lng)
+        objects = self.read(lat, lng)
+        if objects is not None:
+            self.hits += 1
+            return objects
+        self.misses += 1
+        try:
+            objects = self.load(lat, lng)
+        except Exception as e:
+            # Not written so the block is read again once the files are fixed
+            log.error("Unable to load chart block {0},{1}: {2}".format(lat, lng, e))
+            return []
+        self.write(lat, lng, objects)
+        return objects
+
+    def load(self, lat, lng):
+        """ Reads the block from the database like CIFPObjects.find_objects()
+            but lets errors through instead of returning an empty block
+        """
+        objects = list()
+        with open(self.index_path, 'rb') as ifd:
+            with open(self.dbpath, 'rb') as dbfd:
+                for node in CIFPObjects.find_nodes(ifd, lat, lng):
+                    dbfd.seek(node.file_offset)
+                    o = CIFPObjects.parse_line(dbfd)
+                    if o is not None:
+                        objects.append(o)
+        return objects
+
+    def read(self, lat, lng):
+        try:
+            with open(self.filename(lat, lng), 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    magic, version, stamp, count = header.unpack_from(m)
+                    if magic != MAGIC or version != FORMAT_VERSION or \
+                            stamp != self.stamp or \
+                            len(m) != header.size + count * record.size:
+                        return None
+                    return [unpack(fields) for fields in
+                            record.iter_unpack(m[header.size:])]
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def write(self, lat, lng, objects):
+        records = [r for r in (pack(o) for o in objects) if r is not None]
+        filename = self.filename(lat, lng)
+        temp = filename + ".tmp"
+        try:
+            with open(temp, 'wb') as f:
+                f.write(header.pack(MAGIC, FORMAT_VERSION, self.stamp, len(records)))
+                f.write(b''.join(records))
+            os.replace(temp, filename)
+        except OSError as e:
+            log.warning("Unable to cache chart block {0},{1}: {2}".format(lat, lng, e))
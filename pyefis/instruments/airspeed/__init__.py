@@ -14,6 +14,7 @@
 #  along with this program; if not, write to the Free Software
 #  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 
+import math
 import sys
 import time
 
@@ -23,6 +24,8 @@ from PyQt5.QtWidgets import *
 
 import pyavtools.fix as fix
 import pyefis.hmi as hmi
+from pyefis import gui
+from pyefis import hub
 from pyefis.instruments.NumericalDisplay import NumericalDisplay
 
 class Airspeed(QWidget):
@@ -34,7 +37,7 @@ class Airspeed(QWidget):
         self.fontsize = fontsize
         self._airspeed = 0
         self.item = fix.db.get_item("IAS")
-        self.item.valueChanged[float].connect(self.setAirspeed)
+        hub.subscribe("IAS", self.setAirspeed)
         self.item.oldChanged[bool].connect(self.repaint)
         self.item.badChanged[bool].connect(self.repaint)
         self.item.failChanged[bool].connect(self.repaint)
@@ -185,10 +188,14 @@ class Airspeed(QWidget):
     def setAirspeed(self, airspeed):
         if airspeed != self._airspeed:
             self._airspeed = airspeed
-            self.update()
+            gui.scheduleRedraw(self)
 
     airspeed = property(getAirspeed, setAirspeed)
 
+    def resync(self):
+        self._airspeed = self.item.value
+        self.update()
+
     def setAsOld(self,b):
         pass
 
@@ -233,19 +240,25 @@ class Airspeed_Tape(QGraphicsView):
         self.fontsize = 15
         self.majorDiv = 10
         self.minorDiv = 5
+        self.numerical_display = None
+        # Airspeed changes smaller than this are ignored.  None means the
+        # smaller of one pixel on the tape and half a knot on the readout.
+        self.deadband = None
+        self.suppressedUpdates = 0
 
     def resizeEvent(self, event):
         w = self.width()
         h = self.height()
         self.markWidth = w / 5
-        f = QFont()
-        f.setPixelSize(self.fontsize)
+        self.f = QFont()
+        self.f.setPixelSize(self.fontsize)
         tape_height = self.max * self.pph + h
         tape_start = self.max * self.pph + h/2
 
-        dialPen = QPen(QColor(Qt.white))
+        self.dialPen = QPen(QColor(Qt.white))
 
         self.scene = QGraphicsScene(0, 0, w, tape_height)
+        self.scene.setFont(self.f)
         x = self.scene.addRect(0, 0, w, tape_height,
                             QPen(QColor(32, 32, 32)), QBrush(QColor(32, 32, 32)))
         x.setOpacity(self.backgroundOpacity)
@@ -270,56 +283,103 @@ class Airspeed_Tape(QGraphicsView):
         x = self.scene.addRect(r, QPen(Qt.yellow), QBrush(Qt.yellow))
         x.setOpacity(self.foregroundOpacity)
 
-        # Draw the little white lines and the text
-        for i in range(self.max, -1, -1):
-            if i % self.majorDiv == 0:
-                l = self.scene.addLine(0, (- i * self.pph) + tape_start, w / 2,
-                                      (- i * self.pph) + tape_start, dialPen)
-                l.setOpacity(self.foregroundOpacity)
-                t = self.scene.addText(str(i))
-                t.setFont(f)
-                self.scene.setFont(f)
-                t.setDefaultTextColor(QColor(Qt.white))
-                t.setX(w - t.boundingRect().width())
-                t.setY(((- i * self.pph) + tape_start)
-                       - t.boundingRect().height() / 2)
-                t.setOpacity(self.foregroundOpacity)
-            elif i % self.minorDiv ==0:
-                l = self.scene.addLine(0, (- i * self.pph) + tape_start,
-                                   w / 3, (- i * self.pph) + tape_start, dialPen)
-                l.setOpacity(self.foregroundOpacity)
-        # Red Line
+        # Red Line.  It goes over the top of the tick marks which are
+        # added to the scene later as the tape scrolls.
         vnePen = QPen(QColor(Qt.red))
         vnePen.setWidth(4)
         l = self.scene.addLine(0, -self.Vne * self.pph + tape_start,
                                30, -self.Vne * self.pph + tape_start, vnePen)
         l.setOpacity(self.foregroundOpacity)
+        l.setZValue(1)
+
+        # The little white lines and the text are only kept for the part of
+        # the tape around the current airspeed.
+        self.tick_lines = []
+        self.tick_labels = []
+        self.tick_window = None
+        self.layoutTicks()
 
-        self.numerical_display = NumericalDisplay(self)
         nbh = 50
-        self.numerical_display.resize (47, nbh)
+        if self.numerical_display is None:
+            self.numerical_display = NumericalDisplay(self)
+            self.numerical_display.resize (47, nbh)
+            self.setAsOld(self.item.old)
+            self.setAsBad(self.item.bad)
+            self.setAsFail(self.item.fail)
+            hub.subscribe("IAS", self.setAirspeed)
+            self.item.oldChanged[bool].connect(self.setAsOld)
+            self.item.badChanged[bool].connect(self.setAsBad)
+            self.item.failChanged[bool].connect(self.setAsFail)
         self.numeric_box_pos = QPoint(w-48, h/2-nbh/2)
         self.numerical_display.move(self.numeric_box_pos)
         self.numeric_box_pos.setY(self.numeric_box_pos.y()+nbh/2)
         self.numerical_display.show()
         self.numerical_display.value = self._airspeed
-        self.setAsOld(self.item.old)
-        self.setAsBad(self.item.bad)
-        self.setAsFail(self.item.fail)
 
         self.setScene(self.scene)
         self.centerOn(self.scene.width() / 2,
                       -self._airspeed * self.pph + tape_start)
-        self.item.valueChanged[float].connect(self.setAirspeed)
-        self.item.oldChanged[bool].connect(self.setAsOld)
-        self.item.badChanged[bool].connect(self.setAsBad)
-        self.item.failChanged[bool].connect(self.setAsFail)
+
+    # Make sure the tick marks cover the view.  When they don't we lay them
+    # out again for a window of three view heights around the current
+    # airspeed, reusing the items that we already have.
+    def layoutTicks(self):
+        span = self.height() / 2 / self.pph
+        need_lo = max(0, self._airspeed - span)
+        need_hi = min(self.max, self._airspeed + span)
+        if self.tick_window is not None:
+            if self.tick_window[0] <= need_lo and need_hi <= self.tick_window[1]:
+                return
+        lo = max(0, int(math.floor(need_lo - 2*span)))
+        hi = min(self.max, int(math.ceil(need_hi + 2*span)))
+        self.tick_window = (lo, hi)
+
+        w = self.width()
+        tape_start = self.max * self.pph + self.height()/2
+        lines = 0
+        labels = 0
+        for i in range(hi, lo - 1, -1):
+            if i % self.majorDiv == 0:
+                x = w / 2
+            elif i % self.minorDiv == 0:
+                x = w / 3
+            else:
+                continue
+            y = (- i * self.pph) + tape_start
+            if lines < len(self.tick_lines):
+                l = self.tick_lines[lines]
+                l.setLine(0, y, x, y)
+                l.show()
+            else:
+                l = self.scene.addLine(0, y, x, y, self.dialPen)
+                l.setOpacity(self.foregroundOpacity)
+                self.tick_lines.append(l)
+            lines += 1
+            if i % self.majorDiv == 0:
+                if labels < len(self.tick_labels):
+                    t = self.tick_labels[labels]
+                    t.setPlainText(str(i))
+                    t.show()
+                else:
+                    t = self.scene.addText(str(i))
+                    t.setFont(self.f)
+                    t.setDefaultTextColor(QColor(Qt.white))
+                    t.setOpacity(self.foregroundOpacity)
+                    self.tick_labels.append(t)
+                t.setX(w - t.boundingRect().width())
+                t.setY(y - t.boundingRect().height() / 2)
+                labels += 1
+        for l in self.tick_lines[lines:]:
+            l.hide()
+        for t in self.tick_labels[labels:]:
+            t.hide()
 
     def redraw(self):
         if not self.isVisible():
             return
         tape_start = self.max * self.pph + self.height()/2
 
+        self.layoutTicks()
         self.resetTransform()
         self.centerOn(self.scene.width() / 2,
                       -self._airspeed * self.pph + tape_start)
@@ -347,11 +407,32 @@ class Airspeed_Tape(QGraphicsView):
 
     def setAirspeed(self, airspeed):
         if airspeed != self._airspeed:
+            # Without a deadband set, a change that rolls the readout
+            # over to another whole unit is never dropped
+            if abs(airspeed - self._airspeed) < self.getDeadband() and \
+                    (self.deadband is not None or
+                     int(airspeed) == int(self._airspeed)):
+                self.suppressedUpdates += 1
+                return
             self._airspeed = airspeed
-            self.redraw()
+            gui.scheduleRedraw(self, self.redraw)
 
     airspeed = property(getAirspeed, setAirspeed)
 
+    def getDeadband(self):
+        if self.deadband is None:
+            return min(1.0 / self.pph, 0.5)
+        return self.deadband
+
+    def resync(self):
+        self._airspeed = self.item.value
+        if self.numerical_display is None:
+            return
+        self.setAsOld(self.item.old)
+        self.setAsBad(self.item.bad)
+        self.setAsFail(self.item.fail)
+        self.redraw()
+
     def setAsOld(self,b):
         self.numerical_display.old = b
 
@@ -446,3 +527,6 @@ class Airspeed_Mode(QGraphicsView):
             self._AS_Data_Box = str(int(round(d)))
         if self.isVisible():
             self.redraw()
+
+    def resync(self):
+        self.setASData(self.fix_item.value)
@@ -14,6 +14,7 @@
 #  along with this program; if not, write to the Free Software
 #  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 
+import math
 import time
 
 from PyQt5.QtGui import *
@@ -21,6 +22,8 @@ from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 
 import pyavtools.fix as fix
+from pyefis import gui
+from pyefis import hub
 
 from pyefis.instruments.NumericalDisplay import NumericalDisplay
 
@@ -32,7 +35,7 @@ class Altimeter(QWidget):
         self.setFocusPolicy(Qt.NoFocus)
         self._altimeter = 0
         self.item = fix.db.get_item("ALT")
-        self.item.valueChanged[float].connect(self.setAltimeter)
+        hub.subscribe("ALT", self.setAltimeter)
         self.item.oldChanged[bool].connect(self.repaint)
         self.item.badChanged[bool].connect(self.repaint)
         self.item.failChanged[bool].connect(self.repaint)
@@ -152,10 +155,14 @@ class Altimeter(QWidget):
     def setAltimeter(self, altimeter):
         if altimeter != self._altimeter:
             self._altimeter = altimeter
-            self.update()
+            gui.scheduleRedraw(self)
 
     altimeter = property(getAltimeter, setAltimeter)
 
+    def resync(self):
+        self._altimeter = self.item.value
+        self.update()
+
 
 class Altimeter_Tape(QGraphicsView):
     def __init__(self, parent=None, maxalt=50000, fontsize=15):
@@ -177,45 +184,48 @@ class Altimeter_Tape(QGraphicsView):
 
         self.maxalt = maxalt
         self.myparent = parent
+        self.numerical_display = None
+        # Altitude changes smaller than this are ignored.  None means the
+        # smaller of one pixel on the tape and half a foot on the readout.
+        self.deadband = None
+        self.suppressedUpdates = 0
 
 
     def resizeEvent(self, event):
         w = self.width()
-        w_2 = w/2
         h = self.height()
-        f = QFont()
-        f.setPixelSize(self.fontsize)
+        self.f = QFont()
+        self.f.setPixelSize(self.fontsize)
         self.height_pixel = self.maxalt*self.pph + h
 
-        dialPen = QPen(QColor(Qt.white))
-        dialPen.setWidth(2)
+        self.dialPen = QPen(QColor(Qt.white))
+        self.dialPen.setWidth(2)
 
         self.scene = QGraphicsScene(0, 0, w, self.height_pixel)
+        self.scene.setFont(self.f)
         x = self.scene.addRect(0, 0, w, self.height_pixel,
                            QPen(QColor(32, 32, 32)), QBrush(QColor(32, 32, 32)))
         x.setOpacity(self.backgroundOpacity)
 
-        for i in range(self.maxalt, -1, -self.minorDiv):
-            y = self.y_offset(i)
-            if i % self.majorDiv == 0:
-                l = self.scene.addLine(w_2 + 15, y, w, y, dialPen)
-                l.setOpacity(self.foregroundOpacity)
-                t = self.scene.addText(str(i))
-                t.setFont(f)
-                self.scene.setFont(f)
-                t.setDefaultTextColor(QColor(Qt.white))
-                t.setX(0)
-                t.setY(y - t.boundingRect().height() / 2)
-                t.setOpacity(self.foregroundOpacity)
-
-            else:
-                l = self.scene.addLine(w_2 + 30, y, w, y, dialPen)
-                l.setOpacity(self.foregroundOpacity)
+        # Only the tick marks and labels around the current altitude are
+        # in the scene.  They are moved along as the tape scrolls.
+        self.tick_lines = []
+        self.tick_labels = []
+        self.tick_window = None
+        self.layoutTicks()
         self.setScene(self.scene)
 
-        self.numerical_display = NumericalDisplay(self, total_decimals=5, scroll_decimal=2)
         nbh=50
-        self.numerical_display.resize (70, nbh)
+        if self.numerical_display is None:
+            self.numerical_display = NumericalDisplay(self, total_decimals=5, scroll_decimal=2)
+            self.numerical_display.resize (70, nbh)
+            self.setAltOld(self.item.old)
+            self.setAltBad(self.item.bad)
+            self.setAltFail(self.item.fail)
+            hub.subscribe("ALT", self.setAltimeter)
+            self.item.oldChanged[bool].connect(self.setAltOld)
+            self.item.badChanged[bool].connect(self.setAltBad)
+            self.item.failChanged[bool].connect(self.setAltFail)
         self.numeric_box_pos = QPoint(2, h/2-nbh/2)
         self.numerical_display.move(self.numeric_box_pos)
         self.numeric_box_pos.setX(self.numeric_box_pos.x()+self.numerical_display.width())
@@ -223,18 +233,68 @@ class Altimeter_Tape(QGraphicsView):
         self.numerical_display.show()
         self.numerical_display.value = self._altimeter
         self.centerOn(self.scene.width() / 2, self.y_offset(self._altimeter))
-        self.setAltOld(self.item.old)
-        self.setAltBad(self.item.bad)
-        self.setAltFail(self.item.fail)
-        self.item.valueChanged[float].connect(self.setAltimeter)
-        self.item.oldChanged[bool].connect(self.setAltOld)
-        self.item.badChanged[bool].connect(self.setAltBad)
-        self.item.failChanged[bool].connect(self.setAltFail)
 
     def y_offset(self, alt):
         return self.height_pixel - (alt*self.pph) - self.height()/2
 
+    # Make sure the tick marks cover the view.  When they don't we lay them
+    # out again for a window of three view heights around the current
+    # altitude, reusing the items that we already have.
+    def layoutTicks(self):
+        span = self.height() / 2 / self.pph
+        need_lo = max(0, self._altimeter - span)
+        need_hi = min(self.maxalt, self._altimeter + span)
+        if self.tick_window is not None:
+            if self.tick_window[0] <= need_lo and need_hi <= self.tick_window[1]:
+                return
+        # Ticks are counted down from maxalt the same as a full tape would be
+        last = int(self.maxalt // self.minorDiv)
+        first_tick = max(0, int(math.floor((self.maxalt - need_hi - 2*span) / self.minorDiv)))
+        last_tick = min(last, int(math.ceil((self.maxalt - need_lo + 2*span) / self.minorDiv)))
+        self.tick_window = (self.maxalt - last_tick*self.minorDiv,
+                            self.maxalt - first_tick*self.minorDiv)
+
+        w = self.width()
+        w_2 = w/2
+        lines = 0
+        labels = 0
+        for n in range(first_tick, last_tick + 1):
+            i = self.maxalt - n*self.minorDiv
+            y = self.y_offset(i)
+            if i % self.majorDiv == 0:
+                x = w_2 + 15
+            else:
+                x = w_2 + 30
+            if lines < len(self.tick_lines):
+                l = self.tick_lines[lines]
+                l.setLine(x, y, w, y)
+                l.show()
+            else:
+                l = self.scene.addLine(x, y, w, y, self.dialPen)
+                l.setOpacity(self.foregroundOpacity)
+                self.tick_lines.append(l)
+            lines += 1
+            if i % self.majorDiv == 0:
+                if labels < len(self.tick_labels):
+                    t = self.tick_labels[labels]
+                    t.setPlainText(str(i))
+                    t.show()
+                else:
+                    t = self.scene.addText(str(i))
+                    t.setFont(self.f)
+                    t.setDefaultTextColor(QColor(Qt.white))
+                    t.setX(0)
+                    t.setOpacity(self.foregroundOpacity)
+                    self.tick_labels.append(t)
+                t.setY(y - t.boundingRect().height() / 2)
+                labels += 1
+        for l in self.tick_lines[lines:]:
+            l.hide()
+        for t in self.tick_labels[labels:]:
+            t.hide()
+
     def redraw(self):
+        self.layoutTicks()
         self.resetTransform()
         self.centerOn(self.scene.width() / 2, self.y_offset(self._altimeter))
         self.numerical_display.value = self._altimeter
@@ -261,11 +321,31 @@ class Altimeter_Tape(QGraphicsView):
 
     def setAltimeter(self, altimeter):
         if altimeter != self._altimeter:
+            # Same deadband rule as Airspeed_Tape.setAirspeed()
+            if abs(altimeter - self._altimeter) < self.getDeadband() and \
+                    (self.deadband is not None or
+                     int(altimeter) == int(self._altimeter)):
+                self.suppressedUpdates += 1
+                return
             self._altimeter = altimeter
-            self.redraw()
+            gui.scheduleRedraw(self, self.redraw)
 
     altimeter = property(getAltimeter, setAltimeter)
 
+    def getDeadband(self):
+        if self.deadband is None:
+            return min(1.0 / self.pph, 0.5)
+        return self.deadband
+
+    def resync(self):
+        self._altimeter = self.item.value
+        if self.numerical_display is None:
+            return
+        self.setAltOld(self.item.old)
+        self.setAltBad(self.item.bad)
+        self.setAltFail(self.item.fail)
+        self.redraw()
+
     def setAltOld(self,b):
         self.numerical_display.old = b
 
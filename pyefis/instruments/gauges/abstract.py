@@ -20,6 +20,9 @@ from PyQt5.QtWidgets import *
 
 import pyavtools.fix as fix
 import pyefis.hmi as hmi
+from pyefis import common
+from pyefis import gui
+from pyefis import hub
 
 def drawCircle(p, x, y, r, start, end):
     rect = QRect(x - r, y - r, r * 2, r * 2)
@@ -28,6 +31,8 @@ def drawCircle(p, x, y, r, start, end):
 class AbstractGauge(QWidget):
     def __init__(self, parent=None):
         super(AbstractGauge, self).__init__(parent)
+        # Set by a GaugeCanvas that draws this gauge for us
+        self.canvas = None
         self.name = None
         self.highWarn = None
         self.highAlarm = None
@@ -57,6 +62,11 @@ class AbstractGauge(QWidget):
         self.conversionFunction1 = lambda x: x
         self.conversionFunction2 = lambda x: x
         self.decimalPlaces = 1
+        # Changes smaller than this don't redraw the gauge.  None means half
+        # of the last displayed digit.  suppressedUpdates counts how many
+        # values were dropped because of it.
+        self.deadband = None
+        self.suppressedUpdates = 0
         # All these colors can be modified by the parent
         self.outlineColor = QColor(Qt.darkGray)
         # These are the colors that are used when the value's
@@ -94,6 +104,9 @@ class AbstractGauge(QWidget):
         self.highlightColor = self.highlightGoodColor
         self.unitsOverride = None
         self.conversionFunction = lambda x: x
+        # Cached drawing of everything that doesn't move with the value
+        self._background = None
+        self._backgroundKey = None
 
     def interpolate(self, value, range_):
         h = float(range_)
@@ -104,29 +117,52 @@ class AbstractGauge(QWidget):
     def getValue(self):
         return self._value
 
-    def setValue(self, value):
+    def setValue(self, value, force=False):
         self._rawValue = value
         if self.fail:
             self._value = 0.0
         else:
             cvalue = self.conversionFunction(value)
+            if self.clipping:
+                cvalue = common.bounds(self.lowRange, self.highRange, cvalue)
             if cvalue != self._value:
-                if self.clipping:
-                    self._value = common.bounds(self.lowRange, self.highRange, cvalue)
+                if not force and self.inDeadband(cvalue):
+                    self.suppressedUpdates += 1
                 else:
                     self._value = cvalue
-                self.setColors()
-                self.update()
+                    # setColors() calls update() for us
+                    gui.scheduleRedraw(self, self.setColors)
         if self._value > self.peakValue:
             self.peakValue = self._value
 
     value = property(getValue, setValue)
 
+    def getDeadband(self):
+        if self.deadband is None:
+            return 0.5 * 10 ** -self.decimalPlaces
+        return self.deadband
+
+    # A change smaller than the deadband is dropped unless it changes the
+    # limit colors.  Without a deadband set, a change that shows is kept.
+    def inDeadband(self, value):
+        if abs(value - self._value) >= self.getDeadband():
+            return False
+        if self.deadband is None and \
+                self.formatValue(value) != self.formatValue(self._value):
+            return False
+        return common.limitState(value, self.lowWarn, self.lowAlarm,
+                                 self.highWarn, self.highAlarm) == \
+               common.limitState(self._value, self.lowWarn, self.lowAlarm,
+                                 self.highWarn, self.highAlarm)
+
+    def formatValue(self, value):
+        return '{0:.{1}f}'.format(float(value), self.decimalPlaces)
+
     def getValueText(self):
         if self.fail:
             return 'xxx'
         else:
-            return '{0:.{1}f}'.format(float(self.value), self.decimalPlaces)
+            return self.formatValue(self.value)
 
     valueText = property(getValueText)
 
@@ -134,6 +170,8 @@ class AbstractGauge(QWidget):
         return self._dbkey
 
     def setDbkey(self, key):
+        if self._dbkey is not None:
+            hub.unsubscribe(self._dbkey, self.setValue)
         item = fix.db.get_item(key)
         item.auxChanged.connect(self.setAuxData)
         item.reportReceived.connect(self.setupGauge)
@@ -175,23 +213,19 @@ class AbstractGauge(QWidget):
         # set the axuliiary data and the value
         self.setAuxData(item.aux)
         self.setValue(item.value)
+        hub.subscribe(self.dbkey, self.setValue)
 
-        # TODO We have to redo the valueChanged signals because the
-        # datatype may have changed
-        try:
-            item.valueChanged[float].disconnect(self.setValue)
-        except:
-            pass # One will probably fail all the time
-        try:
-            item.valueChanged[int].disconnect(self.setValue)
-        except:
-            pass # One will probably fail all the time
-
-        if item.dtype == float:
-            item.valueChanged[float].connect(self.setValue)
-        elif item.dtype == int:
-            item.valueChanged[int].connect(self.setValue)
 
+    def resync(self):
+        if self.dbkey is None:
+            return
+        item = fix.db.get_item(self.dbkey)
+        self.fail = item.fail
+        self.bad = item.bad
+        self.old = item.old
+        self.annunciate = item.annunciate
+        self.setValue(item.value)
+        self.setColors()
 
     def setAuxData(self, auxdata):
         if "Min" in auxdata and auxdata["Min"] != None:
@@ -240,6 +274,51 @@ class AbstractGauge(QWidget):
 
         self.update()
 
+    # Gauges that split their drawing into drawStatic() and drawDynamic()
+    # get the static part cached in a pixmap.  It is only drawn again when
+    # something in staticKey() changes, i.e. the size, the range and limits
+    # from the aux data, the units or the colors.
+    def paintEvent(self, event):
+        p = QPainter(self)
+        self.drawGauge(p)
+
+    def update(self, *args):
+        if self.canvas is None:
+            super(AbstractGauge, self).update(*args)
+        else:
+            self.canvas.updateGauge(self)
+
+    def drawGauge(self, p):
+        key = self.staticKey()
+        if self._background is None or key != self._backgroundKey:
+            ratio = self.devicePixelRatioF()
+            self._background = QPixmap(self.size() * ratio)
+            self._background.setDevicePixelRatio(ratio)
+            self._background.fill(Qt.transparent)
+            bp = QPainter(self._background)
+            self.drawStatic(bp)
+            bp.end()
+            self._backgroundKey = key
+        p.drawPixmap(0, 0, self._background)
+        self.drawDynamic(p)
+
+    def staticKey(self):
+        return (self.width(), self.height(), self.name, self.units,
+                self.lowRange, self.highRange, self.lowWarn, self.lowAlarm,
+                self.highWarn, self.highAlarm, self.bgColor.rgba(),
+                self.safeColor.rgba(), self.warnColor.rgba(),
+                self.alarmColor.rgba(), self.textColor.rgba())
+
+    def invalidateBackground(self):
+        self._background = None
+        self.update()
+
+    def drawStatic(self, p):
+        pass
+
+    def drawDynamic(self, p):
+        pass
+
     def annunciateFlag(self, flag):
         self.annunciate = flag
         self.setColors()
@@ -249,7 +328,7 @@ class AbstractGauge(QWidget):
         if flag:
             self.setValue(0.0)
         else:
-            self.setValue(fix.db.get_item(self.dbkey).value)
+            self.setValue(fix.db.get_item(self.dbkey).value, force=True)
         self.setColors()
 
     def badFlag(self, flag):
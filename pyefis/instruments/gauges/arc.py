@@ -41,7 +41,7 @@ class ArcGauge(AbstractGauge):
         self.arrow.append(QPointF(-5,5+self.arcRadius * .5))
         self.arrow.append(QPointF(0,self.arcRadius * .5))
 
-    def paintEvent(self, e):
+    def drawStatic(self, p):
         start = self.startAngle
         sweep = self.sweepAngle
         r = self.arcRadius
@@ -68,7 +68,6 @@ class ArcGauge(AbstractGauge):
             highAlarmAngle = sweep
         centerX = self.arcCenter.x()
         centerY = self.arcCenter.y()
-        p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing)
         pen = QPen()
         pen.setWidth(10)
@@ -96,6 +95,23 @@ class ArcGauge(AbstractGauge):
         drawCircle(p, self.arcCenter.x(), self.arcCenter.y(), r,
         start + (sweep - highWarnAngle), highWarnAngle-lowWarnAngle)
 
+        # Draw Text
+        pen.setColor(self.textColor)
+        pen.setWidth(1)
+        p.setPen(pen)
+        f = QFont()
+        f.setPixelSize(self.height() / 6)
+        p.setFont(f)
+        opt = QTextOption(Qt.AlignLeft | Qt.AlignBottom)
+        #p.drawText(QPoint(centerX - (r - 40), centerY - (r - 40)), self.name)
+        p.drawText(QPoint(self.width() / 20,f.pixelSize()), self.name)
+
+    def drawDynamic(self, p):
+        sweep = self.sweepAngle
+        p.setRenderHint(QPainter.Antialiasing)
+        pen = QPen()
+        pen.setCapStyle(Qt.FlatCap)
+
         # Now we draw the line pointer
         brush = QBrush(self.penColor)
         pen.setColor(QColor(Qt.black))
@@ -109,18 +125,8 @@ class ArcGauge(AbstractGauge):
         arrow = t.map(self.arrow)
         p.drawPolygon(arrow)
 
-        # Draw Text
-        pen.setColor(self.textColor)
-        pen.setWidth(1)
-        p.setPen(pen)
-        f = QFont()
-        f.setPixelSize(self.height() / 6)
-        p.setFont(f)
-        opt = QTextOption(Qt.AlignLeft | Qt.AlignBottom)
-        #p.drawText(QPoint(centerX - (r - 40), centerY - (r - 40)), self.name)
-        p.drawText(QPoint(self.width() / 20,f.pixelSize()), self.name)
-
         # Main value text
+        f = QFont()
         path = QPainterPath()
         brush = QBrush(self.valueColor)
         p.setBrush(brush)
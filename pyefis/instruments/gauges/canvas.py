@@ -0,0 +1,81 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+from PyQt5.QtGui import *
+from PyQt5.QtCore import *
+from PyQt5.QtWidgets import *
+
+
+# Hidden widgets don't get resize events until they are shown so we send
+# them ourselves.  The parent goes first since its resizeEvent() usually
+# lays out the children.
+def sendPendingResize(widget):
+    if widget.testAttribute(Qt.WA_PendingResizeEvent):
+        widget.setAttribute(Qt.WA_PendingResizeEvent, False)
+        QApplication.sendEvent(widget, QResizeEvent(widget.size(), QSize()))
+    for child in widget.findChildren(QWidget, options=Qt.FindDirectChildrenOnly):
+        sendPendingResize(child)
+
+
+class GaugeCanvas(QWidget):
+    """Draws a group of gauges in one widget with a single painter.  The
+       gauges are created as children of the canvas and handed to
+       addGauge().  They are never shown themselves, anything with a
+       drawGauge(painter) method can be drawn.  When a gauge changes only
+       its own rectangle of the canvas is painted again."""
+    def __init__(self, parent=None):
+        super(GaugeCanvas, self).__init__(parent)
+        self.setFocusPolicy(Qt.NoFocus)
+        # Filling our own background keeps Qt from painting the parent
+        # under every gauge that changes
+        self.setAutoFillBackground(True)
+        self.gauges = []
+        self.rects = []
+
+    def addGauge(self, gauge):
+        gauge.hide()
+        for w in [gauge] + gauge.findChildren(QWidget):
+            if hasattr(w, "canvas"):
+                w.canvas = self
+        self.gauges.append(gauge)
+        self.rects.append(gauge.geometry())
+        return gauge
+
+    def setGaugeGeometry(self, gauge, x, y, width, height):
+        i = self.gauges.index(gauge)
+        gauge.setGeometry(x, y, width, height)
+        sendPendingResize(gauge)
+        self.update(self.rects[i].united(gauge.geometry()))
+        self.rects[i] = gauge.geometry()
+
+    def updateGauge(self, gauge):
+        self.update(QRect(gauge.mapTo(self, QPoint(0, 0)), gauge.size()))
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        dirty = event.region()
+        bounds = dirty.boundingRect()
+        for gauge, rect in zip(self.gauges, self.rects):
+            if not dirty.intersects(rect):
+                continue
+            p.save()
+            p.translate(rect.topLeft())
+            # Painting is already clipped to the dirty region so the gauge
+            # only needs clipping when it doesn't cover all of it
+            if not rect.contains(bounds):
+                p.setClipRect(0, 0, rect.width(), rect.height())
+            gauge.drawGauge(p)
+            p.restore()
@@ -1,4 +1,4 @@
-#  Copyright (c) 2019 Phil Birkelbach
+#  Copyright (c) 2013 Phil Birkelbach
 #
 #  This program is free software; you can redistribute it and/or modify
 #  it under the terms of the GNU General Public License as published by
@@ -14,82 +14,441 @@
 #  along with this program; if not, write to the Free Software
 #  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 
+from array import array
+from functools import partial
+
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 
-
+import pyavtools.fix as fix
 import pyefis.hmi as hmi
-from .abstract import AbstractGauge
-from .verticalBar import VerticalBar
+from pyefis import common
+from pyefis import gui
+from pyefis import hub
+from pyefis.common import textcache
+
+# The EGT bars of all the cylinders are drawn by this one widget.  The
+# values, peaks and normalize references are kept in arrays indexed by
+# cylinder and every cylinder that changes in a frame costs a single repaint
+# of the group.  The bars look the same as a row of VerticalBar gauges.
 
 class EGTGroup(QWidget):
     def __init__(self, parent=None, cylinders = 4, dbkeys = ["EGT11", "EGT12", "EGT13", "EGT14"]):
         super(EGTGroup, self).__init__(parent)
         self.setMinimumSize(50, 100)
-        self.bars = []
-        #self.conversionFunction = lambda x: x * (9.0/5.0) + 32.0
+        # Set by a GaugeCanvas that draws this group for us
+        self.canvas = None
+        self.name = None
+        self.cylinders = cylinders
+        self.dbkeys = list(dbkeys[:cylinders])
+        self.cylinderNames = [str(i+1) for i in range(cylinders)]
+        self.values = array('d', [0.0] * cylinders)
+        self.peaks = array('d', [0.0] * cylinders)
+        self.references = array('d', [0.0] * cylinders)
+        self.lowRange = array('d', [0.0] * cylinders)
+        self.highRange = array('d', [100.0] * cylinders)
+        self.lowWarn = [None] * cylinders
+        self.lowAlarm = [None] * cylinders
+        self.highWarn = [None] * cylinders
+        self.highAlarm = [None] * cylinders
+        self.fail = bytearray(cylinders)
+        self.bad = bytearray(cylinders)
+        self.old = bytearray(cylinders)
+        self.annunciate = bytearray(cylinders)
+        self.suppressedUpdates = 0
+        self._units = ""
+
         self.normalizeMode = False
         self.peakMode = False
-        for i in range(cylinders):
-            bar = VerticalBar(self)
-            bar.name = str(i+1)
-            bar.decimalPlaces = 0
-            bar.showUnits = False
-            bar.peakMode = False
-            bar.conversionFunction1 = lambda x: x * (9.0/5.0) + 32.0
-            bar.conversionFunction2 = lambda x: x
-            bar.unitsOverride1 = u'\N{DEGREE SIGN}F'
-            bar.unitsOverride2 = u'\N{DEGREE SIGN}C'
-            bar.setUnitSwitching()
-            bar.unitGroup = "Temperature"
-            bar.dbkey = dbkeys[i]
-            bar.normalizeRange = 400
-            self.bars.append(bar)
+        self.normalizeRange = 400
+        self.decimalPlaces = 0
+        self.deadband = None
+        self.showUnits = False
+        self.textGap = 3
+        self.barWidthPercent = 0.3
+        self.lineWidthPercent = 0.5
         self.smallFontPercent = 0.08
         self.bigFontPercent = 0.10
+
+        self.conversionFunction1 = lambda x: x * (9.0/5.0) + 32.0
+        self.conversionFunction2 = lambda x: x
+        self.unitsOverride1 = u'\N{DEGREE SIGN}F'
+        self.unitsOverride2 = u'\N{DEGREE SIGN}C'
+        self.unitGroup = "Temperature"
+        self.currentUnits = 1
+        self.conversionFunction = self.conversionFunction1
+        self.unitsOverride = self.unitsOverride1
+
+        self.bgGoodColor = QColor(Qt.black)
+        self.safeGoodColor = QColor(Qt.green)
+        self.warnGoodColor = QColor(Qt.yellow)
+        self.alarmGoodColor = QColor(Qt.red)
+        self.textGoodColor = QColor(Qt.white)
+        self.penGoodColor = QColor(Qt.white)
+        self.bgBadColor = QColor(Qt.black)
+        self.safeBadColor = QColor(Qt.darkGray)
+        self.warnBadColor = QColor(Qt.darkYellow)
+        self.alarmBadColor = QColor(Qt.darkRed)
+        self.textBadColor = QColor(Qt.gray)
+        self.penBadColor = QColor(Qt.gray)
+        self.textAnnunciateColor = QColor(Qt.red)
+        self.normalizePenColor = QColor(Qt.blue)
+        self.peakColor = QColor(Qt.magenta)
+
+        self._background = None
+        self._backgroundKey = None
+        self.barRects = []
+
+        # The callbacks have to stay the same objects so that subscribing
+        # again when an item is reported doesn't add another one
+        self.callbacks = [partial(self.setCylinder, i) for i in range(cylinders)]
+        for i, key in enumerate(self.dbkeys):
+            item = fix.db.get_item(key)
+            item.auxChanged.connect(partial(self.setAuxData, i))
+            item.reportReceived.connect(partial(self.setupCylinder, i))
+            item.annunciateChanged.connect(partial(self.setFlag, self.annunciate, i))
+            item.oldChanged.connect(partial(self.setFlag, self.old, i))
+            item.badChanged.connect(partial(self.setFlag, self.bad, i))
+            item.failChanged.connect(partial(self.failFlag, i))
+            self.setupCylinder(i)
         hmi.actions.setEgtMode.connect(self.setMode)
+        hmi.actions.setInstUnits.connect(self.setUnits)
+
+    def getUnits(self):
+        if self.unitsOverride:
+            return self.unitsOverride
+        else:
+            return self._units
+
+    units = property(getUnits)
+
+    def getDeadband(self):
+        if self.deadband is None:
+            return 0.5 * 10 ** -self.decimalPlaces
+        return self.deadband
+
+    # Same rule as AbstractGauge.inDeadband() for cylinder i
+    def inDeadband(self, i, value):
+        old = self.values[i]
+        if abs(value - old) >= self.getDeadband():
+            return False
+        if self.deadband is None and self.formatValue(value) != self.formatValue(old):
+            return False
+        limits = (self.lowWarn[i], self.lowAlarm[i], self.highWarn[i],
+                  self.highAlarm[i])
+        return common.limitState(value, *limits) == common.limitState(old, *limits)
+
+    def formatValue(self, value):
+        return '{0:.{1}f}'.format(value, self.decimalPlaces)
+
+    def setupCylinder(self, i):
+        item = fix.db.get_item(self.dbkeys[i])
+        if item.min: self.lowRange[i] = self.conversionFunction(item.min)
+        if item.max: self.highRange[i] = self.conversionFunction(item.max)
+        self._units = item.units
+        self.fail[i] = item.fail
+        self.bad[i] = item.bad
+        self.old[i] = item.old
+        self.annunciate[i] = item.annunciate
+        self.setAuxData(i, item.aux)
+        self.setCylinder(i, item.value)
+        hub.subscribe(self.dbkeys[i], self.callbacks[i])
+
+    def setAuxData(self, i, auxdata):
+        if "Min" in auxdata and auxdata["Min"] != None:
+            self.lowRange[i] = self.conversionFunction(auxdata["Min"])
+        if "Max" in auxdata and auxdata["Max"] != None:
+            self.highRange[i] = self.conversionFunction(auxdata["Max"])
+        for name in ["lowWarn", "lowAlarm", "highWarn", "highAlarm"]:
+            if name in auxdata and auxdata[name] != None:
+                getattr(self, name)[i] = self.conversionFunction(auxdata[name])
+        self.update()
+
+    def storeValue(self, i, value, force=False):
+        """Stores the value of cylinder i and returns True if it needs to be
+           drawn again"""
+        changed = False
+        if self.fail[i]:
+            changed = self.values[i] != 0.0
+            self.values[i] = 0.0
+        else:
+            cvalue = self.conversionFunction(value)
+            if cvalue != self.values[i]:
+                if not force and self.inDeadband(i, cvalue):
+                    self.suppressedUpdates += 1
+                else:
+                    self.values[i] = cvalue
+                    changed = True
+        if self.values[i] > self.peaks[i]:
+            self.peaks[i] = self.values[i]
+        return changed
+
+    def setCylinder(self, i, value):
+        if self.storeValue(i, value):
+            gui.scheduleRedraw(self, self.update)
+
+    def setValues(self, values):
+        """Sets all of the cylinders at once from a sequence of values"""
+        changed = False
+        for i, value in enumerate(values):
+            changed = self.storeValue(i, value) or changed
+        if changed:
+            gui.scheduleRedraw(self, self.update)
+
+    def setFlag(self, flags, i, flag):
+        flags[i] = flag
+        self.update()
+
+    def failFlag(self, i, flag):
+        self.fail[i] = flag
+        if flag:
+            self.storeValue(i, 0.0)
+        else:
+            self.storeValue(i, fix.db.get_item(self.dbkeys[i]).value, force=True)
+        self.update()
+
+    def resync(self):
+        for i, key in enumerate(self.dbkeys):
+            item = fix.db.get_item(key)
+            self.fail[i] = item.fail
+            self.bad[i] = item.bad
+            self.old[i] = item.old
+            self.annunciate[i] = item.annunciate
+            self.storeValue(i, item.value)
+        self.update()
+
+    def update(self, *args):
+        if self.canvas is None:
+            super(EGTGroup, self).update(*args)
+        else:
+            self.canvas.updateGauge(self)
 
     def setMode(self, args):
         if args.lower() == "normalize":
-            if self.normalizeMode:
-                self.normalizeMode = False
-            else:
-                self.normalizeMode = True
-            for bar in self.bars:
-                bar.normalizeMode = self.normalizeMode
+            self.setNormalizeMode(not self.normalizeMode)
         elif args.lower() == "peak":
-            if self.peakMode:
-                self.peakMode = False
-            else:
-                self.peakMode = True
-            for bar in self.bars:
-                bar.peakMode = self.peakMode
+            self.peakMode = not self.peakMode
         elif args.lower() == "reset peak":
-            for bar in self.bars:
-                bar.resetPeak()
+            self.resetPeak()
         elif args.lower() == "lean":
-            self.normalizeMode = True
+            self.resetPeak()
+            self.setNormalizeMode(True)
             self.peakMode = True
-            for bar in self.bars:
-                bar.resetPeak()
-                bar.normalizeMode = self.normalizeMode
-                bar.peakMode = self.peakMode
         elif args.lower() == "normal":
-            self.normalizeMode = False
+            self.setNormalizeMode(False)
             self.peakMode = False
-            for bar in self.bars:
-                bar.normalizeMode = self.normalizeMode
-                bar.peakMode = self.peakMode
+        self.update()
+
+    def setNormalizeMode(self, x):
+        if x and not self.normalizeMode:
+            self.references[:] = self.values
+        self.normalizeMode = bool(x)
 
+    def resetPeak(self):
+        self.peaks[:] = self.values
 
+    def setUnits(self, args):
+        x = args.split(':')
+        command = x[1].lower()
+        names = x[0].split(',')
+        if '*' in names or self.unitGroup in names or \
+                any(key in names for key in self.dbkeys):
+            if command == "toggle":
+                if self.currentUnits == 1:
+                    self.unitsOverride = self.unitsOverride2
+                    self.conversionFunction = self.conversionFunction2
+                    self.currentUnits = 2
+                else:
+                    self.unitsOverride = self.unitsOverride1
+                    self.conversionFunction = self.conversionFunction1
+                    self.currentUnits = 1
+            # Convert the aux data and the values again
+            for i, key in enumerate(self.dbkeys):
+                item = fix.db.get_item(key)
+                self.setAuxData(i, item.aux)
+                self.setCylinder(i, item.value)
+
+    def interpolate(self, i, value, range_):
+        h = float(range_)
+        l = self.lowRange[i]
+        m = self.highRange[i]
+        return ((value - l) / (m - l)) * h
 
     def resizeEvent(self, event):
-        cylcount = len(self.bars)
-        barwidth = self.width() / cylcount
-        barheight = self.height()
-        x = 0
-        for bar in self.bars:
-            bar.resize(barwidth, barheight)
-            bar.move(barwidth * x, 0)
-            x += 1
+        # Each bar is a whole number of pixels wide
+        barwidth = self.width() / self.cylinders
+        self.barRects = [QRect(int(barwidth * i), 0, int(barwidth), self.height())
+                         for i in range(self.cylinders)]
+        w = int(barwidth)
+        h = self.height()
+        self.barWidth = w * self.barWidthPercent
+        self.lineWidth = w * self.lineWidthPercent
+        self.bigFont = QFont()
+        self.bigFont.setPixelSize(int(h * self.bigFontPercent))
+        self.smallFont = QFont()
+        self.smallFont.setPixelSize(int(h * self.smallFontPercent))
+        self.barTop = self.smallFont.pixelSize() + self.textGap
+        self.barBottom = h - (self.bigFont.pixelSize() + self.textGap)
+        if self.showUnits:
+            self.barBottom -= (self.smallFont.pixelSize() + self.textGap)
+        self.barLeft = (w - self.barWidth) / 2
+        self.lineLeft = (w - self.lineWidth) / 2
+        self.barHeight = self.barBottom - self.barTop
+
+        self.nameTextRect = QRectF(0, 0, w, self.smallFont.pixelSize())
+        self.valueTextRect = QRectF(0, self.barBottom + self.textGap, w, self.bigFont.pixelSize())
+        self.unitsTextRect = QRectF(0, h - self.smallFont.pixelSize() - self.textGap, w, self.smallFont.pixelSize())
+
+    def isBad(self, i):
+        return self.bad[i] or self.fail[i] or self.old[i]
+
+    def textColor(self, i):
+        if self.annunciate[i] and not self.fail[i]:
+            return self.textAnnunciateColor
+        return self.textBadColor if self.isBad(i) else self.textGoodColor
+
+    def valueColor(self, i):
+        bad = self.isBad(i)
+        color = self.textColor(i)
+        value = self.values[i]
+        if self.lowWarn[i] != None and value < self.lowWarn[i]:
+            color = self.warnBadColor if bad else self.warnGoodColor
+        if self.highWarn[i] != None and value > self.highWarn[i]:
+            color = self.warnBadColor if bad else self.warnGoodColor
+        if self.lowAlarm[i] != None and value < self.lowAlarm[i]:
+            color = self.alarmBadColor if bad else self.alarmGoodColor
+        if self.highAlarm[i] != None and value > self.highAlarm[i]:
+            color = self.alarmBadColor if bad else self.alarmGoodColor
+        return color
+
+    def valueText(self, i):
+        if self.fail[i]:
+            return 'xxx'
+        return self.formatValue(self.values[i])
+
+    def staticKey(self):
+        return (self.width(), self.height(), self.units, self.showUnits,
+                tuple(self.cylinderNames), tuple(self.lowRange),
+                tuple(self.highRange), tuple(self.lowWarn),
+                tuple(self.lowAlarm), tuple(self.highWarn),
+                tuple(self.highAlarm), tuple(map(self.isBad, range(self.cylinders))),
+                tuple(self.textColor(i).rgba() for i in range(self.cylinders)))
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        self.drawGauge(p)
+
+    # The names, units and colored bands only change with the data quality,
+    # the limits and the size so they are drawn once into a pixmap
+    def drawGauge(self, p):
+        key = self.staticKey()
+        if self._background is None or key != self._backgroundKey:
+            ratio = self.devicePixelRatioF()
+            self._background = QPixmap(self.size() * ratio)
+            self._background.setDevicePixelRatio(ratio)
+            self._background.fill(Qt.transparent)
+            bp = QPainter(self._background)
+            for i, rect in enumerate(self.barRects):
+                bp.save()
+                bp.translate(rect.topLeft())
+                bp.setClipRect(0, 0, rect.width(), rect.height())
+                self.drawStatic(bp, i)
+                bp.restore()
+            bp.end()
+            self._backgroundKey = key
+        p.drawPixmap(0, 0, self._background)
+        for i, rect in enumerate(self.barRects):
+            p.save()
+            p.translate(rect.topLeft())
+            p.setClipRect(0, 0, rect.width(), rect.height(), Qt.IntersectClip)
+            self.drawDynamic(p, i)
+            p.restore()
+
+    def drawStatic(self, p, i):
+        bad = self.isBad(i)
+        p.setRenderHint(QPainter.Antialiasing)
+        pen = QPen()
+        pen.setWidth(1)
+        pen.setCapStyle(Qt.FlatCap)
+        opt = QTextOption(Qt.AlignCenter)
+        pen.setColor(self.textColor(i))
+        p.setPen(pen)
+        p.setFont(self.smallFont)
+        p.drawText(self.nameTextRect, self.cylinderNames[i], opt)
+        if self.showUnits:
+            p.drawText(self.unitsTextRect, self.units, opt)
+
+        # Draws the bar
+        p.setRenderHint(QPainter.Antialiasing, False)
+        color = self.safeBadColor if bad else self.safeGoodColor
+        pen.setColor(color)
+        p.setPen(pen)
+        p.setBrush(color)
+        p.drawRect(self.barLeft, self.barTop, self.barWidth, self.barHeight)
+
+        # Draw Warning and Alarm Bands
+        for color, low, high in [
+                (self.warnBadColor if bad else self.warnGoodColor,
+                 self.lowWarn[i], self.highWarn[i]),
+                (self.alarmBadColor if bad else self.alarmGoodColor,
+                 self.lowAlarm[i], self.highAlarm[i])]:
+            pen.setColor(color)
+            p.setPen(pen)
+            p.setBrush(color)
+            if low and low >= self.lowRange[i]:
+                x = self.interpolate(i, low, self.barHeight)
+                p.drawRect(self.barLeft, self.barBottom - x,
+                           self.barWidth, x + 1)
+            if high and high <= self.highRange[i]:
+                p.drawRect(self.barLeft, self.barTop, self.barWidth,
+                           self.barHeight - self.interpolate(i, high, self.barHeight))
+
+    def drawDynamic(self, p, i):
+        bad = self.isBad(i)
+        p.setRenderHint(QPainter.Antialiasing)
+        pen = QPen()
+        pen.setWidth(1)
+        pen.setCapStyle(Qt.FlatCap)
+        opt = QTextOption(Qt.AlignCenter)
+        p.setFont(self.bigFont)
+        dv = self.values[i] - self.peaks[i]
+        if self.peakMode and dv <= -10:
+            pen.setColor(self.peakColor)
+            text = str(round(dv))
+        else:
+            pen.setColor(self.valueColor(i))
+            text = self.valueText(i)
+        p.setPen(pen)
+        textcache.drawText(p, self.valueTextRect, text, opt)
+
+        p.setRenderHint(QPainter.Antialiasing, False)
+        # Peak line
+        if self.peakMode:
+            pen.setColor(QColor(Qt.white))
+            p.setPen(pen)
+            p.setBrush(QBrush(self.peakColor))
+            p.drawRect(self.lineLeft, self.lineY(i, self.peaks[i]) - 2,
+                       self.lineWidth, 4)
+
+        # Indicator line
+        if bad:
+            p.setBrush(QBrush(self.penBadColor))
+        elif self.normalizeMode:
+            p.setBrush(QBrush(self.normalizePenColor))
+        else:
+            p.setBrush(QBrush(self.penGoodColor))
+        pen.setColor(QColor(Qt.gray if self.normalizeMode else Qt.darkGray))
+        p.setPen(pen)
+        p.drawRect(self.lineLeft, self.lineY(i, self.values[i]) - 2,
+                   self.lineWidth, 4)
+
+    def lineY(self, i, value):
+        if self.normalizeMode:
+            start = self.barTop + self.barHeight / 2
+            y = start - ((value - self.references[i]) * self.barHeight / self.normalizeRange)
+        else:
+            y = self.barTop + (self.barHeight - self.interpolate(i, value, self.barHeight))
+        if y < self.barTop: y = self.barTop
+        if y > self.barBottom: y = self.barBottom
+        return y
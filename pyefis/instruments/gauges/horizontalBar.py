@@ -19,6 +19,7 @@ from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 
 
+from pyefis.common import textcache
 from .abstract import AbstractGauge
 
 class HorizontalBar(AbstractGauge):
@@ -37,8 +38,7 @@ class HorizontalBar(AbstractGauge):
         self.valueTextRect = QRectF(1, self.barTop + self.barHeight + 4,
                                     self.width()-5, self.height() / 2)
 
-    def paintEvent(self, event):
-        p = QPainter(self)
+    def drawStatic(self, p):
         p.setRenderHint(QPainter.Antialiasing)
         pen = QPen()
         pen.setWidth(1)
@@ -53,13 +53,6 @@ class HorizontalBar(AbstractGauge):
         opt = QTextOption(Qt.AlignRight)
         p.drawText(self.valueTextRect, self.units, opt)
 
-        # Main Value
-        p.setFont(self.bigFont)
-        pen.setColor(self.valueColor)
-        p.setPen(pen)
-        opt = QTextOption(Qt.AlignLeft | Qt.AlignBottom)
-        p.drawText(self.valueTextRect, self.valueText, opt)
-
         # Draws the bar
         p.setRenderHint(QPainter.Antialiasing, False)
         pen.setColor(self.safeColor)
@@ -91,7 +84,22 @@ class HorizontalBar(AbstractGauge):
             x = self.interpolate(self.highAlarm, self.width())
             p.drawRect(x, self.barTop,
                        self.width() - x, self.barHeight)
+
+    def drawDynamic(self, p):
+        p.setRenderHint(QPainter.Antialiasing)
+        pen = QPen()
+        pen.setWidth(1)
+        pen.setCapStyle(Qt.FlatCap)
+
+        # Main Value
+        p.setFont(self.bigFont)
+        pen.setColor(self.valueColor)
+        p.setPen(pen)
+        opt = QTextOption(Qt.AlignLeft | Qt.AlignBottom)
+        textcache.drawText(p, self.valueTextRect, self.valueText, opt)
+
         # Indicator Line
+        p.setRenderHint(QPainter.Antialiasing, False)
         pen.setColor(QColor(Qt.darkGray))
         brush = QBrush(self.penColor)
         pen.setWidth(1)
@@ -19,6 +19,7 @@ from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 
 
+from pyefis.common import textcache
 from .abstract import AbstractGauge
 
 class NumericDisplay(AbstractGauge):
@@ -47,8 +48,7 @@ class NumericDisplay(AbstractGauge):
         else:
             self.valueTextRect = QRectF(0, 0, self.width(), self.height())
 
-    def paintEvent(self, event):
-        p = QPainter(self)
+    def drawGauge(self, p):
         p.setRenderHint(QPainter.Antialiasing)
 
         pen = QPen()
@@ -61,10 +61,10 @@ class NumericDisplay(AbstractGauge):
         p.setPen(pen)
         p.setFont(self.bigFont)
         opt = QTextOption(self.alignment)
-        p.drawText(self.valueTextRect, self.valueText, opt)
+        textcache.drawText(p, self.valueTextRect, self.valueText, opt)
 
         # Draw Units
         if self.showUnits:
             p.setFont(self.smallFont)
             opt = QTextOption(self.unitsAlignment)
-            p.drawText(self.unitsTextRect, self.units, opt)
+            textcache.drawText(p, self.unitsTextRect, self.units, opt)
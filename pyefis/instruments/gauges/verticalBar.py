@@ -19,6 +19,7 @@ from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 
 
+from pyefis.common import textcache
 from .abstract import AbstractGauge
 
 class VerticalBar(AbstractGauge):
@@ -106,10 +107,9 @@ class VerticalBar(AbstractGauge):
         pen.setColor(self.valueColor)
         p.setPen(pen)
         p.setFont(self.bigFont)
-        p.drawText(self.valueTextRect, self.valueText, QTextOption(Qt.AlignCenter))
+        textcache.drawText(p, self.valueTextRect, self.valueText, QTextOption(Qt.AlignCenter))
 
-    def paintEvent(self, event):
-        p = QPainter(self)
+    def drawStatic(self, p):
         p.setRenderHint(QPainter.Antialiasing)
 
         pen = QPen()
@@ -122,19 +122,6 @@ class VerticalBar(AbstractGauge):
             p.setPen(pen)
             p.setFont(self.smallFont)
             p.drawText(self.nameTextRect, self.name, opt)
-        if self.showValue:
-            if self.peakMode:
-                dv = self.value - self.peakValue
-                if dv <= -10:
-                    pen.setColor(self.peakColor)
-                    p.setFont(self.bigFont)
-                    p.setPen(pen)
-                    p.drawText(self.valueTextRect, str(round(dv)), opt)
-                else:
-                    self.drawValue(p, pen)
-            else:
-                # Draw Value
-                self.drawValue(p, pen)
         if self.showUnits:
             # Units
             pen.setColor(self.textColor)
@@ -179,7 +166,30 @@ class VerticalBar(AbstractGauge):
                        self.barWidth,
                        self.barHeight - self.interpolate(self.highAlarm, self.barHeight))
 
+    def drawDynamic(self, p):
+        p.setRenderHint(QPainter.Antialiasing)
+
+        pen = QPen()
+        pen.setWidth(1)
+        pen.setCapStyle(Qt.FlatCap)
+        p.setPen(pen)
+        opt = QTextOption(Qt.AlignCenter)
+        if self.showValue:
+            if self.peakMode:
+                dv = self.value - self.peakValue
+                if dv <= -10:
+                    pen.setColor(self.peakColor)
+                    p.setFont(self.bigFont)
+                    p.setPen(pen)
+                    textcache.drawText(p, self.valueTextRect, str(round(dv)), opt)
+                else:
+                    self.drawValue(p, pen)
+            else:
+                # Draw Value
+                self.drawValue(p, pen)
+
         # Highlight Ball
+        p.setRenderHint(QPainter.Antialiasing, False)
         if self.highlight:
             pen.setColor(Qt.black)
             pen.setWidth(1)
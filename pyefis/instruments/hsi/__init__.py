@@ -24,7 +24,8 @@ from PyQt5.QtWidgets import *
 
 from pyefis import common
 import pyavtools.fix as fix
-from pyefis import common
+from pyefis import gui
+from pyefis import hub
 
 # TODO: Add CDI and Glide Slope indicators and tick marks but make them
 #       configurable.
@@ -47,23 +48,23 @@ class HSI(QGraphicsView):
 
         item = fix.db.get_item("COURSE")
         self._headingSelect = item.value
-        item.valueChanged[float].connect(self.setHeadingBug)
+        hub.subscribe("COURSE", self.setHeadingBug)
         self._courseSelect = 1
 
         self.cdidb = fix.db.get_item("CDI")
         self._courseDeviation = self.cdidb.value
-        self.cdidb.valueChanged[float].connect(self.setCdi)
+        hub.subscribe("CDI", self.setCdi)
         self._showCDI = not self.cdidb.old
 
         self.gsidb = fix.db.get_item("GSI")
         self._glideSlopeIndicator = self.gsidb.value
-        self.gsidb.valueChanged[float].connect(self.setGsi)
+        hub.subscribe("GSI", self.setGsi)
         self._showGSI = not self.gsidb.old
         self.cardinal = ["N", "E", "S", "W"]
 
         self.item = fix.db.get_item("HEAD")
         self._heading = self.item.value
-        self.item.valueChanged[float].connect(self.setHeading)
+        hub.subscribe("HEAD", self.setHeading)
         self.heading_bug = None
         self.item.failChanged[bool].connect(self.setFail)
         self._fail = False
@@ -236,22 +237,17 @@ class HSI(QGraphicsView):
         return self._heading
 
     def setHeading(self, heading):
-        if not self.isVisible():
-            return
         if heading != self._heading:
-            now = time.time()
-            newheading = common.bounds(0, 360, heading)
-            diff = newheading - self._heading
-            if diff > 180:
-                diff -= 360
-            elif diff < -180:
-                diff += 360
-            self._heading = newheading
-            self.rotate(-diff)
-            self.last_update_time = now
+            self._heading = common.bounds(0, 360, heading)
+            self.last_update_time = time.time()
+            gui.scheduleRedraw(self, self.redraw)
 
     heading = property(getHeading, setHeading)
 
+    def redraw(self):
+        self.resetTransform()
+        self.rotate(-self._heading)
+
     def setFail(self, fail):
         if fail != self._fail:
             self._fail = fail
@@ -275,6 +271,15 @@ class HSI(QGraphicsView):
 
     headingBug = property(getHeadingBug, setHeadingBug)
 
+    def resync(self):
+        self.setFail(self.item.fail)
+        self.setHeadingBug(fix.db.get_item("COURSE").value)
+        self._heading = common.bounds(0, 360, self.item.value)
+        self._courseDeviation = self.cdidb.value
+        self._glideSlopeIndicator = self.gsidb.value
+        self.redraw()
+        self.update()
+
     def getCdi(self):
         return self._courseDeviation
 
@@ -315,7 +320,7 @@ class HeadingDisplay(QWidget):
 
         self.item = fix.db.get_item("HEAD")
         self._heading = self.item.value
-        self.item.valueChanged[float].connect(self.setHeading)
+        hub.subscribe("HEAD", self.setHeading)
         self.item.failChanged[bool].connect(self.setFail)
         self.item.badChanged[bool].connect(self.setBad)
         self.item.oldChanged[bool].connect(self.setOld)
@@ -364,7 +369,7 @@ class HeadingDisplay(QWidget):
     def setHeading(self, heading):
         if heading != self._heading:
             self._heading = common.bounds(0, 360, heading)
-            self.update()
+            gui.scheduleRedraw(self)
 
     heading = property(getHeading, setHeading)
 
@@ -380,6 +385,13 @@ class HeadingDisplay(QWidget):
         self._bad = bad
         self.repaint()
 
+    def resync(self):
+        self._heading = common.bounds(0, 360, self.item.value)
+        self._fail = self.item.fail
+        self._old = self.item.old
+        self._bad = self.item.bad
+        self.update()
+
 class DG_Tape(QGraphicsView):
     def __init__(self, parent=None):
         super(DG_Tape, self).__init__(parent)
@@ -395,8 +407,8 @@ class DG_Tape(QGraphicsView):
         self._courseDevation = 1
         self.cardinal = ["N", "E", "S", "W", "N"]
 
-        item = fix.db.get_item("HEAD", True)
-        item.valueChanged[float].connect(self.setHeading)
+        self.item = fix.db.get_item("HEAD", True)
+        hub.subscribe("HEAD", self.setHeading)
 
         #fix.db.get_item("COURSE", True).valueChanged[float].connect(self.setHeadingBug)
 
@@ -469,6 +481,10 @@ class DG_Tape(QGraphicsView):
     def setHeading(self, heading):
         if heading != self._heading:
             self._heading = heading
-            self.redraw()
+            gui.scheduleRedraw(self, self.redraw)
 
     heading = property(getHeading, setHeading)
+
+    def resync(self):
+        self._heading = self.item.value
+        self.redraw()
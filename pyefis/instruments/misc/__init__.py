@@ -19,6 +19,9 @@ from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 
 import pyavtools.fix as fix
+from pyefis import gui
+from pyefis import hub
+from pyefis.common import textcache
 
 class StaticText(QWidget):
     """Represents a simple static text display.  This is very simple and is
@@ -38,6 +41,9 @@ class StaticText(QWidget):
 
     def paintEvent(self, event):
         p = QPainter(self)
+        self.drawGauge(p)
+
+    def drawGauge(self, p):
         p.setRenderHint(QPainter.Antialiasing)
 
         pen = QPen()
@@ -108,7 +114,7 @@ class ValueDisplay(QWidget):
         p.setPen(pen)
         p.setFont(self.font)
         opt = QTextOption(self.alignment)
-        p.drawText(self.valueRect, self.valueText, opt)
+        textcache.drawText(p, self.valueRect, self.valueText, opt)
 
 
 
@@ -122,8 +128,8 @@ class ValueDisplay(QWidget):
             cvalue = self.conversionFunction(value)
             if cvalue != self._value:
                 self._value = cvalue
-                self.setColors()
-                self.update()
+                # setColors() calls update() for us
+                gui.scheduleRedraw(self, self.setColors)
 
     value = property(getValue, setValue)
 
@@ -139,6 +145,8 @@ class ValueDisplay(QWidget):
         return self._dbkey
 
     def setDbkey(self, key):
+        if self._dbkey is not None:
+            hub.unsubscribe(self._dbkey, self.setValue)
         self.item = fix.db.get_item(key)
         self.item.reportReceived.connect(self.setupGauge)
         self.item.annunciateChanged.connect(self.annunciateFlag)
@@ -164,17 +172,18 @@ class ValueDisplay(QWidget):
         self.setColors()
         # set the axuliiary data and the value
         self.setValue(self.item.value)
+        hub.subscribe(self.dbkey, self.setValue)
 
-        try:
-            self.item.valueChanged[float].disconnect(self.setValue)
-            self.item.valueChanged[int].disconnect(self.setValue)
-            self.item.valueChanged[bool].disconnect(self.setValue)
-            self.item.valueChanged[str].disconnect(self.setValue)
-        except:
-            pass # One will probably fail all the time
-
-        self.item.valueChanged[self.item.dtype].connect(self.setValue)
 
+    def resync(self):
+        if self._dbkey is None:
+            return
+        self.fail = self.item.fail
+        self.bad = self.item.bad
+        self.old = self.item.old
+        self.annunciate = self.item.annunciate
+        self.setValue(self.item.value)
+        self.setColors()
 
     def setColors(self):
         if self.bad or self.fail or self.old:
@@ -20,6 +20,11 @@ from PyQt5.QtGui import *
 from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 
+from pyefis.common import textcache
+
+# Background colour for each annunciator state
+STATE_COLORS = {0:Qt.black, 1:Qt.yellow, 2:Qt.red, 3:Qt.green}
+
 
 class Panel_Annunciator(QGraphicsView):
     def __init__(self, parent=None):
@@ -31,6 +36,11 @@ class Panel_Annunciator(QGraphicsView):
         self.setFocusPolicy(Qt.NoFocus)
         self._Mode_Indicator = 0
         self.Warning_State_Label = "null"
+        self.bcolor = QBrush(QColor(Qt.black))
+        self.pcolor = QPen(QColor(Qt.gray))
+        # The scene items are made once in resizeEvent() and restyled after
+        self.frame = None
+        self.label = None
 
     def resizeEvent(self, event):
         self.w = self.width()
@@ -39,58 +49,36 @@ class Panel_Annunciator(QGraphicsView):
         self.f.setBold(True)
         self.f.setPixelSize(16)
 
-        dialPen = QPen(QColor(Qt.white))
-        dialPen.setWidth(5)
-
         self.scene = QGraphicsScene(0, 0, self.w, self.h)
-        self.scene.addRect(0, 0, self.w, self.h,
-                           QPen(QColor(Qt.gray)), QBrush(QColor(Qt.black)))
+        self.scene.setFont(self.f)
+        self.frame = self.scene.addRect(0, 0, self.w, self.h,
+                                        self.pcolor, self.bcolor)
         self.scene.addRect(1, 1, self.w -2, self.h -2,
                            QPen(QColor(Qt.black)), QBrush(QColor(Qt.transparent)))
-        t = self.scene.addText(str(self.Warning_State_Label))
-        t.setFont(self.f)
-        self.scene.setFont(self.f)
-        t.setDefaultTextColor(QColor(Qt.white))
-        t.setX((self.w - t.boundingRect().width()) / 2)
-        t.setY((self.h - t.boundingRect().height()) / 2)
+        self.label = self.scene.addText(str(self.Warning_State_Label))
+        self.label.setFont(self.f)
+        self.label.setDefaultTextColor(QColor(Qt.white))
+        self.centerLabel()
         self.setScene(self.scene)
 
-    def redraw(self):
-        self.scene.clear()
-        self.scene.addRect(0, 0, self.w, self.h,
-                           self.pcolor, self.bcolor)
-        self.scene.addRect(1, 1, self.w -2, self.h -2,
-                           QPen(QColor(Qt.black)), QBrush(QColor(Qt.transparent)))
-        t = self.scene.addText(str(self.Warning_State_Label))
-        t.setFont(self.f)
-        self.scene.setFont(self.f)
-        t.setDefaultTextColor(QColor(Qt.white))
-        t.setX((self.w - t.boundingRect().width()) / 2)
-        t.setY(((self.h - t.boundingRect().height()) / 2))
+    def centerLabel(self):
+        self.label.setX((self.w - self.label.boundingRect().width()) / 2)
+        self.label.setY((self.h - self.label.boundingRect().height()) / 2)
 
-        self.setScene(self.scene)
+    def redraw(self):
+        if self.frame is None:
+            return
+        self.frame.setPen(self.pcolor)
+        self.frame.setBrush(self.bcolor)
 
     def getState(self):
         return self._Mode_Indicator
 
     def setState(self, Mode):
-        if Mode != self._Mode_Indicator:
-            if Mode == 0:
-                self._Mode_Indicator = 0
-                self.bcolor = QBrush(QColor(Qt.black))
-                self.pcolor = QPen(QColor(Qt.gray))
-            elif Mode == 1:
-                self._Mode_Indicator = 1
-                self.bcolor = QBrush(QColor(Qt.yellow))
-                self.pcolor = QPen(QColor(Qt.gray))
-            elif Mode == 2:
-                self._Mode_Indicator = 2
-                self.bcolor = QBrush(QColor(Qt.red))
-                self.pcolor = QPen(QColor(Qt.gray))
-            elif Mode == 3:
-                self._Mode_Indicator = 3
-                self.bcolor = QBrush(QColor(Qt.green))
-                self.pcolor = QPen(QColor(Qt.gray))
+        if Mode != self._Mode_Indicator and Mode in STATE_COLORS:
+            self._Mode_Indicator = Mode
+            self.bcolor = QBrush(QColor(STATE_COLORS[Mode]))
+            self.pcolor = QPen(QColor(Qt.gray))
             self.redraw()
 
     def getWARNING_Name(self):
@@ -98,6 +86,90 @@ class Panel_Annunciator(QGraphicsView):
 
     def setWARNING_Name(self, w_Name):
         self.Warning_State_Label = str(w_Name)
+        if self.label is not None:
+            self.label.setPlainText(self.Warning_State_Label)
+            self.centerLabel()
 
 
     panel_annunciator = property(getState, setState, getWARNING_Name, setWARNING_Name)
+
+
+class AnnunciatorPanel(QWidget):
+    """A grid of annunciators drawn by one widget.  Changing the state of one
+       only repaints its own cell."""
+    def __init__(self, parent=None, columns=4):
+        super(AnnunciatorPanel, self).__init__(parent)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.columns = columns
+        self.labels = []
+        self.states = []
+        self.rects = []
+        self.font = QFont()
+        self.font.setBold(True)
+        self.font.setPixelSize(16)
+        self.outlinePen = QPen(QColor(Qt.gray))
+        self.borderPen = QPen(QColor(Qt.black))
+        self.textColor = QColor(Qt.white)
+        self.brushes = {mode:QBrush(QColor(color))
+                        for mode, color in STATE_COLORS.items()}
+
+    def addAnnunciator(self, label, state=0):
+        """Adds an annunciator to the end of the grid and returns its index"""
+        if state not in STATE_COLORS:
+            state = 0
+        self.labels.append(str(label))
+        self.states.append(state)
+        self.layoutCells()
+        self.update()
+        return len(self.labels) - 1
+
+    def index(self, annunciator):
+        if isinstance(annunciator, str):
+            return self.labels.index(annunciator)
+        return annunciator
+
+    def getState(self, annunciator):
+        return self.states[self.index(annunciator)]
+
+    def setState(self, annunciator, mode):
+        """Sets the state of the annunciator given by index or label"""
+        i = self.index(annunciator)
+        if mode != self.states[i] and mode in STATE_COLORS:
+            self.states[i] = mode
+            if i < len(self.rects):
+                self.update(self.rects[i].toAlignedRect())
+
+    def setLabel(self, annunciator, label):
+        i = self.index(annunciator)
+        self.labels[i] = str(label)
+        if i < len(self.rects):
+            self.update(self.rects[i].toAlignedRect())
+
+    def layoutCells(self):
+        count = len(self.labels)
+        rows = max(1, (count + self.columns - 1) // self.columns)
+        w = self.width() / self.columns
+        h = self.height() / rows
+        self.rects = [QRectF((i % self.columns) * w, (i // self.columns) * h, w, h)
+                      for i in range(count)]
+
+    def resizeEvent(self, event):
+        self.layoutCells()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setFont(self.font)
+        opt = QTextOption(Qt.AlignCenter)
+        dirty = QRectF(event.rect())
+        for rect, label, state in zip(self.rects, self.labels, self.states):
+            if not rect.intersects(dirty):
+                continue
+            p.setPen(self.outlinePen)
+            p.setBrush(self.brushes[state])
+            p.drawRect(rect.adjusted(0, 0, -1, -1))
+            p.setPen(self.borderPen)
+            p.setBrush(Qt.NoBrush)
+            p.drawRect(rect.adjusted(1, 1, -2, -2))
+            p.setPen(self.textColor)
+            textcache.drawText(p, rect, label, opt)
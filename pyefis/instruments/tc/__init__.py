@@ -22,6 +22,8 @@ from PyQt5.QtWidgets import *
 import math
 import pyavtools.fix as fix
 import pyavtools.filters as filters
+from pyefis import gui
+from pyefis import hub
 
 class TurnCoordinator(QWidget):
     def __init__(self, parent=None, dial=True, ss_only=False, filter_depth=0):
@@ -42,12 +44,12 @@ class TurnCoordinator(QWidget):
         else:
             self.filter = None
         self.alat_item = fix.db.get_item("ALAT")
-        self.alat_item.valueChanged[float].connect(self.setLatAcc)
+        hub.subscribe("ALAT", self.setLatAcc)
         self.alat_item.badChanged.connect(self.quality_change)
         self.alat_item.oldChanged.connect(self.quality_change)
         self.alat_item.failChanged.connect(self.quality_change)
         self.rot_item = fix.db.get_item("ROT")
-        self.rot_item.valueChanged[float].connect(self.setROT)
+        hub.subscribe("ROT", self.setROT)
         self.rot_item.badChanged.connect(self.quality_change)
         self.rot_item.oldChanged.connect(self.quality_change)
         self.rot_item.failChanged.connect(self.quality_change)
@@ -214,7 +216,7 @@ class TurnCoordinator(QWidget):
     def setROT(self, rot):
         if rot != self._rate:
             self._rate = rot
-            self.update()
+            gui.scheduleRedraw(self)
 
     rate = property(getROT, setROT)
 
@@ -228,13 +230,21 @@ class TurnCoordinator(QWidget):
         else:
             self._latAcc = acc
         if last_acc != self._latAcc:
-            self.update()
+            gui.scheduleRedraw(self)
 
     latAcc = property(getLatAcc, setLatAcc)
 
     def quality_change(self, x):
         self.update()
 
+    def resync(self):
+        self._rate = self.rot_item.value
+        if self.filter is not None:
+            self._latAcc = self.filter.setValue(self.alat_item.value)
+        else:
+            self._latAcc = self.alat_item.value
+        self.update()
+
 class TurnCoordinator_Tape(QWidget):
     def __init__(self, parent=None):
         super(TurnCoordinator_Tape, self).__init__(parent)
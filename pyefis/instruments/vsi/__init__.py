@@ -22,6 +22,9 @@ from PyQt5.QtWidgets import *
 
 
 import pyavtools.fix as fix
+from pyefis import gui
+from pyefis import hub
+from pyefis.common.trend import TrendEstimator
 
 
 class VSI_Dial(QWidget):
@@ -35,7 +38,7 @@ class VSI_Dial(QWidget):
         self.maxRange = 2000
         self.maxAngle = 170.0
         self.item = fix.db.get_item("VS")
-        self.item.valueChanged[float].connect(self.setROC)
+        hub.subscribe("VS", self.setROC)
         self.item.oldChanged[bool].connect(self.repaint)
         self.item.badChanged[bool].connect(self.repaint)
         self.item.failChanged[bool].connect(self.repaint)
@@ -186,10 +189,14 @@ class VSI_Dial(QWidget):
     def setROC(self, roc):
         if roc != self._roc:
             self._roc = roc
-            self.update()
+            gui.scheduleRedraw(self)
 
     roc = property(getROC, setROC)
 
+    def resync(self):
+        self._roc = self.item.value
+        self.update()
+
 
 class VSI_PFD(QWidget):
     def __init__(self, parent=None, fontsize=15):
@@ -201,7 +208,7 @@ class VSI_PFD(QWidget):
         self.scaleRoot = 0.7
         self._value = 0
         self.item = fix.db.get_item("VS")
-        self.item.valueChanged[float].connect(self.setValue)
+        hub.subscribe("VS", self.setValue)
         self.item.oldChanged[bool].connect(self.repaint)
         self.item.badChanged[bool].connect(self.repaint)
         self.item.failChanged[bool].connect(self.repaint)
@@ -278,10 +285,14 @@ class VSI_PFD(QWidget):
 
     def setValue(self, value):
         self._value = value
-        self.update()
+        gui.scheduleRedraw(self)
 
     value = property(getValue, setValue)
 
+    def resync(self):
+        self._value = self.item.value
+        self.update()
+
 
     # We don't want this responding to keystrokes
     def keyPressEvent(self, event):
@@ -303,8 +314,16 @@ class AS_Trend_Tape(QGraphicsView):
         self.setFocusPolicy(Qt.NoFocus)
         self._airspeed = 0
         self._airspeed_diff = 0
-        self._airspeed_trend = []
-        self.freq = 10
+        # The bar shows the airspeed this many seconds from now
+        self.trend_seconds = 6
+        self._airspeed_trend = TrendEstimator()
+        self.trend_bar = None
+        hub.subscribe("IAS", self.setAS_Trend)
+        # IAS isn't sent while it holds steady so the bar is brought back
+        # to zero on a timer
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.decay)
+        self.timer.start(100)
 
     def resizeEvent(self, event):
         w = self.width()
@@ -322,43 +341,35 @@ class AS_Trend_Tape(QGraphicsView):
                            w, h / 2,
                            self.zeroPen)
 
+        # Only the size of the bar changes after this
+        self.trend_bar = self.scene.addRect(w / 2, h / 2, w / 2 + 5, 0,
+                                            QPen(QColor(Qt.white)),
+                                            QBrush(QColor(Qt.white)))
         self.setScene(self.scene)
+        self.centerOn(self.scene.width() / 2, h / 2)
+        if len(self._airspeed_trend):
+            self.redraw()
 
     def redraw(self):
-        self.scene.clear()
-        self.scene.addRect(0, 0, self.width(), self.height(),
-                           QPen(QColor(Qt.black)), QBrush(QColor(Qt.black)))
-
-        self.scene.addLine(0, self.height() / 2,
-                           self.width(), self.height() / 2,
-                           self.zeroPen)
-
-        self.centerOn(self.scene.width() / 2,
-                      self.height() / 2)
-
-        self._airspeed_diff = (sum(self._airspeed_trend) / len(
-                               self._airspeed_trend)) * 60
+        if self.trend_bar is None:
+            return
+        self._airspeed_diff = self._airspeed_trend.rate() * self.trend_seconds
+        self.trend_bar.setRect(self.width() / 2, self.height() / 2,
+                               self.width() / 2 + 5,
+                               self._airspeed_diff * -self.pph)
 
-        self.scene.addRect(self.width() / 2, self.height() / 2,
-                           self.width() / 2 + 5,
-                           self._airspeed_diff * -self.pph,
-                           QPen(QColor(Qt.white)), QBrush(QColor(Qt.white)))
+    def decay(self):
+        if self._airspeed_diff or len(self._airspeed_trend):
+            gui.scheduleRedraw(self, self.redraw)
 
-        self.setScene(self.scene)
+    # The samples kept coming in while we were hidden, only the bar is behind
+    def resync(self):
+        self.redraw()
 
     def setAS_Trend(self, airspeed):
-        if airspeed != self._airspeed:
-            if len(self._airspeed_trend) == self.freq:
-                del self._airspeed_trend[0]
-            self._airspeed_trend.append(airspeed - self._airspeed)
-            self._airspeed = airspeed
-            self.redraw()
-        elif airspeed == self._airspeed:
-            if len(self._airspeed_trend) == self.freq:
-                del self._airspeed_trend[0]
-            self._airspeed_trend.append(airspeed - self._airspeed)
-            self._airspeed = airspeed
-            self.redraw()
+        self._airspeed_trend.add(airspeed)
+        self._airspeed = airspeed
+        gui.scheduleRedraw(self, self.redraw)
 
     altimeter = property(setAS_Trend)
 
@@ -385,6 +396,8 @@ class Alt_Trend_Tape(QGraphicsView):
         self._fail = self.item.fail
         self.myparent = parent
         self.update_period = None
+        # Set when the vertical speed is worked out from the altitude
+        self.alt_trend = None
 
     def resizeEvent(self, event):
         if self.update_period is None:
@@ -392,6 +405,18 @@ class Alt_Trend_Tape(QGraphicsView):
             if self.update_period is None:
                 self.update_period = .1
             self.last_update_time = 0
+            if self.myparent.get_config_item('vsi_source') == "ALT":
+                self.alt_trend = TrendEstimator()
+                # ALT isn't sent during level flight so the rate is
+                # brought back to zero on a timer
+                self.timer = QTimer(self)
+                self.timer.timeout.connect(self.decay)
+                self.timer.start(int(self.update_period * 1000))
+                self.item = fix.db.get_item("ALT")
+                self._vs = 0
+                self._bad = self.item.bad
+                self._old = self.item.old
+                self._fail = self.item.fail
         w = self.width() - self.RIGHT_MARGIN
         w_2 = w / 2
         h = self.height()
@@ -438,7 +463,10 @@ class Alt_Trend_Tape(QGraphicsView):
             else:
                 self.scene.addLine(w_2 + 10, y, w, y, tapePen)
         self.setScene(self.scene)
-        self.item.valueChanged[float].connect(self.setVs)
+        if self.alt_trend is None:
+            hub.subscribe("VS", self.setVs)
+        else:
+            hub.subscribe("ALT", self.setAltitude)
         self.item.oldChanged[bool].connect(self.setOld)
         self.item.badChanged[bool].connect(self.setBad)
         self.item.failChanged[bool].connect(self.setFail)
@@ -480,10 +508,27 @@ class Alt_Trend_Tape(QGraphicsView):
     def setVs(self, vs):
         if vs != self._vs:
             self._vs = vs
-            self.redraw()
+            gui.scheduleRedraw(self, self.redraw)
 
     vs = property(setVs)
 
+    def setAltitude(self, alt):
+        self.alt_trend.add(alt)
+        self.decay()
+
+    def decay(self):
+        self.setVs(int(round(self.alt_trend.rate() * 60)))
+
+    def resync(self):
+        if self.alt_trend is None:
+            self._vs = self.item.value
+        self._bad = self.item.bad
+        self._old = self.item.old
+        self._fail = self.item.fail
+        # Don't let the update period hold back the first redraw
+        self.last_update_time = 0
+        self.redraw()
+
     def setVsText(self):
         if self._fail:
             self.vstext.setPlainText("XXX")
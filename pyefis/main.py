@@ -46,6 +46,8 @@ import pyavtools.fix as fix
 import pyefis.hooks as hooks
 import pyefis.hmi as hmi
 import pyefis.gui as gui
+import pyefis.replay as replay
+import pyefis.profiler as profiler
 
 
 def main():
@@ -61,6 +63,12 @@ def main():
                         help='Alternate configuration file')
     parser.add_argument('--log-config', type=argparse.FileType('r'),
                         help='Alternate logger configuration file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time the painting of every instrument')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='Replay a recording, or "synthetic" for generated data, instead of connecting to FIX Gateway')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='Playback speed multiplier for --replay')
 
     args = parser.parse_args()
 
@@ -90,9 +98,15 @@ def main():
         log.setLevel(logging.DEBUG)
     log.info("Starting pyEFIS")
 
-    fix.initialize(config)
+    if args.replay:
+        replay.initialize(config, args.replay, args.replay_speed)
+    else:
+        fix.initialize(config)
     hmi.initialize(config)
 
+    if args.profile or config["main"].get("profile", False):
+        profiler.initialize()
+
     if 'FMS' in config:
         sys.path.insert(0, config["FMS"]["module_dir"])
         fms = importlib.import_module ("FixIntf")
@@ -0,0 +1,138 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# Optional timing of the paintEvent() and redraw() methods of every
+# instrument.  It is turned on with --profile or with profile: True in the
+# main section of the configuration and the results are shown on the
+# diagnostic screen.
+
+import time
+import logging
+import pkgutil
+import importlib
+import weakref
+from collections import deque
+
+from PyQt5.QtWidgets import *
+
+enabled = False
+# widget: {"paint": Profile, "redraw": Profile}
+profiles = weakref.WeakKeyDictionary()
+_active = set()
+
+# The last size calls and how long each one took
+class Profile(object):
+    def __init__(self, size=200):
+        self.times = deque(maxlen=size)
+        self.durations = deque(maxlen=size)
+
+    def add(self, start, duration):
+        self.times.append(start)
+        self.durations.append(duration)
+
+    def rate(self, now=None):
+        if not self.times:
+            return 0.0
+        if now is None:
+            now = time.perf_counter()
+        span = now - self.times[0]
+        if span <= 0:
+            return 0.0
+        return len(self.times) / span
+
+    def percentile(self, pct):
+        if not self.durations:
+            return 0.0
+        d = sorted(self.durations)
+        return d[min(len(d) - 1, int(len(d) * pct / 100.0))]
+
+
+def widgetName(w):
+    name = type(w).__name__
+    for attr in ["dbkey", "name"]:
+        label = getattr(w, attr, None)
+        if isinstance(label, str):
+            return "{0}({1})".format(name, label)
+    return name
+
+def getProfile(widget, kind):
+    try:
+        p = profiles[widget]
+    except KeyError:
+        p = profiles[widget] = {}
+    try:
+        return p[kind]
+    except KeyError:
+        p[kind] = Profile()
+        return p[kind]
+
+def timed(function, kind):
+    def wrapper(self, *args, **kwargs):
+        # Subclasses that call up to a method we've also wrapped are only
+        # counted once
+        key = (id(self), kind)
+        if key in _active:
+            return function(self, *args, **kwargs)
+        _active.add(key)
+        start = time.perf_counter()
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            getProfile(self, kind).add(start, time.perf_counter() - start)
+            _active.discard(key)
+    wrapper.profiled = True
+    return wrapper
+
+def wrapClass(cls):
+    for name, kind in [("paintEvent", "paint"), ("redraw", "redraw")]:
+        function = cls.__dict__.get(name)
+        if function is None or getattr(function, "profiled", False):
+            continue
+        setattr(cls, name, timed(function, kind))
+
+def initialize(package="pyefis.instruments"):
+    global enabled
+    log = logging.getLogger(__name__)
+    pkg = importlib.import_module(package)
+    modules = [pkg]
+    for info in pkgutil.walk_packages(pkg.__path__, package + "."):
+        try:
+            modules.append(importlib.import_module(info.name))
+        except Exception as e:
+            log.warning("Unable to profile {0}: {1}".format(info.name, e))
+    for module in modules:
+        for obj in list(vars(module).values()):
+            if isinstance(obj, type) and issubclass(obj, QWidget) and \
+               obj.__module__ == module.__name__:
+                wrapClass(obj)
+    enabled = True
+    log.info("Instrument profiling enabled")
+
+def report(now=None):
+    """Returns a list of dictionaries, one for each instrument that has
+       been profiled"""
+    if now is None:
+        now = time.perf_counter()
+    result = []
+    for widget, p in list(profiles.items()):
+        r = {"widget":widget, "name":widgetName(widget)}
+        for kind in ["paint", "redraw"]:
+            prof = p.get(kind)
+            r[kind + "_rate"] = prof.rate(now) if prof else 0.0
+            r[kind + "_p50"] = prof.percentile(50) if prof else 0.0
+            r[kind + "_p99"] = prof.percentile(99) if prof else 0.0
+        result.append(r)
+    return result
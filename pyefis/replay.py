@@ -0,0 +1,361 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# Drives pyEfis from a recorded or synthetic data stream instead of a
+# FIX Gateway server.  Recordings are text files with one sample per line
+# in the same form that FIX Gateway sends them, with the time in seconds
+# from the start of the recording in front.
+#
+#   0.000 IAS.Vne;160
+#   0.050 IAS;95.2;0000
+#   0.050 ALT;3520.0;0010
+#
+# The flags are annunciate, old, bad and fail.  Lines without flags leave
+# them alone and keys with a dot in them set auxiliary data.
+
+import math
+import logging
+import time
+
+from PyQt5.QtCore import *
+
+import pyavtools.fix as fix
+import pyavtools.scheduler as scheduler
+
+log = logging.getLogger(__name__)
+
+# Definitions for the items that pyEfis uses.  key: (type, min, max, units,
+# aux data).  Anything else is created as a float the first time that it
+# is asked for.
+ENGINE_AUX = ["Min", "Max", "lowWarn", "lowAlarm", "highWarn", "highAlarm"]
+
+ITEMS = {
+    "ROLL":    ("float", -180.0, 180.0, "deg", {}),
+    "PITCH":   ("float", -90.0, 90.0, "deg", {}),
+    "HEAD":    ("float", 0.0, 359.9, "deg", {}),
+    "COURSE":  ("float", 0.0, 359.9, "deg", {}),
+    "ALT":     ("float", -1000.0, 60000.0, "ft", {}),
+    "BARO":    ("float", 0.0, 35.0, "inHg", {}),
+    "IAS":     ("float", 0.0, 1000.0, "knots",
+                {"Min":0.0, "Max":200.0, "Vs":45.0, "Vs0":40.0, "Vno":120.0,
+                 "Vne":160.0, "Vfe":85.0}),
+    "TAS":     ("float", 0.0, 2000.0, "knots", {}),
+    "VS":      ("float", -30000.0, 30000.0, "ft/min", {"Min":-2000.0, "Max":2000.0}),
+    "ALAT":    ("float", -30.0, 30.0, "g", {}),
+    "ROT":     ("float", -1000.0, 1000.0, "deg/s", {}),
+    "CDI":     ("float", -1.0, 1.0, "", {}),
+    "GSI":     ("float", -1.0, 1.0, "", {}),
+    "LAT":     ("float", -90.0, 90.0, "deg", {}),
+    "LONG":    ("float", -180.0, 180.0, "deg", {}),
+    "OAT":     ("float", -100.0, 100.0, "degC",
+                {"Min":-40.0, "Max":50.0, "lowWarn":0.0, "lowAlarm":-20.0,
+                 "highWarn":None, "highAlarm":None}),
+    "TACH1":   ("int", 0, 3000, "RPM",
+                {"Min":0, "Max":2800, "lowWarn":None, "lowAlarm":None,
+                 "highWarn":2600, "highAlarm":2700}),
+    "MAP1":    ("float", 0.0, 60.0, "inHg",
+                {"Min":0.0, "Max":30.0, "lowWarn":None, "lowAlarm":None,
+                 "highWarn":None, "highAlarm":None}),
+    "OILP1":   ("float", 0.0, 200.0, "psi",
+                {"Min":0.0, "Max":100.0, "lowWarn":30.0, "lowAlarm":20.0,
+                 "highWarn":80.0, "highAlarm":90.0}),
+    "OILT1":   ("float", 0.0, 150.0, "degC",
+                {"Min":0.0, "Max":120.0, "lowWarn":40.0, "lowAlarm":None,
+                 "highWarn":105.0, "highAlarm":110.0}),
+    "H2OT1":   ("float", 0.0, 150.0, "degC",
+                {"Min":0.0, "Max":120.0, "lowWarn":50.0, "lowAlarm":None,
+                 "highWarn":100.0, "highAlarm":110.0}),
+    "FUELP1":  ("float", 0.0, 200.0, "psi",
+                {"Min":0.0, "Max":40.0, "lowWarn":5.0, "lowAlarm":3.0,
+                 "highWarn":None, "highAlarm":None}),
+    "FUELF1":  ("float", 0.0, 100.0, "gal/hr",
+                {"Min":0.0, "Max":15.0, "lowWarn":None, "lowAlarm":None,
+                 "highWarn":None, "highAlarm":None}),
+    "FUELQ1":  ("float", 0.0, 200.0, "gal",
+                {"Min":0.0, "Max":20.0, "lowWarn":5.0, "lowAlarm":2.0,
+                 "highWarn":None, "highAlarm":None}),
+    "FUELQ2":  ("float", 0.0, 200.0, "gal",
+                {"Min":0.0, "Max":20.0, "lowWarn":5.0, "lowAlarm":2.0,
+                 "highWarn":None, "highAlarm":None}),
+    "FUELQT":  ("float", 0.0, 400.0, "gal",
+                {"Min":0.0, "Max":40.0, "lowWarn":10.0, "lowAlarm":4.0,
+                 "highWarn":None, "highAlarm":None}),
+    "CHTMAX1": ("float", 0.0, 1000.0, "degF", {}),
+    "EGTAVG1": ("float", 0.0, 1000.0, "degF", {}),
+    "VOLT":    ("float", 0.0, 18.0, "volt",
+                {"Min":8.0, "Max":16.0, "lowWarn":12.0, "lowAlarm":11.0,
+                 "highWarn":14.8, "highAlarm":15.5}),
+    "CURRNT":  ("float", -60.0, 60.0, "amps",
+                {"Min":-30.0, "Max":30.0, "lowWarn":None, "lowAlarm":None,
+                 "highWarn":None, "highAlarm":None}),
+    "HOBBS1":  ("float", 0.0, 99999.0, "hours", {}),
+    "TIMEZ":   ("str", None, None, "", {}),
+    "ENC1":    ("int", -32768, 32767, "", {}),
+}
+for cyl in range(1, 7):
+    ITEMS["EGT1{0}".format(cyl)] = ("float", 0.0, 1000.0, "degF",
+        {"Min":800.0, "Max":1600.0, "lowWarn":None, "lowAlarm":None,
+         "highWarn":1500.0, "highAlarm":1550.0})
+    ITEMS["CHT1{0}".format(cyl)] = ("float", 0.0, 1000.0, "degF",
+        {"Min":100.0, "Max":500.0, "lowWarn":None, "lowAlarm":None,
+         "highWarn":435.0, "highAlarm":460.0})
+for btn in range(1, 17):
+    ITEMS["BTN{0}".format(btn)] = ("bool", None, None, "", {})
+
+# Synthetic data is a sine wave for each of these keys.  key: (center,
+# amplitude, period in seconds)
+SYNTHETIC = {
+    "ROLL":    (0.0, 30.0, 17.0),
+    "PITCH":   (2.0, 8.0, 11.0),
+    "HEAD":    (180.0, 90.0, 60.0),
+    "ALT":     (3500.0, 400.0, 40.0),
+    "IAS":     (100.0, 20.0, 23.0),
+    "TAS":     (108.0, 20.0, 23.0),
+    "VS":      (0.0, 600.0, 40.0),
+    "ALAT":    (0.0, 0.05, 7.0),
+    "ROT":     (0.0, 2.0, 13.0),
+    "CDI":     (0.0, 0.6, 29.0),
+    "GSI":     (0.0, 0.6, 31.0),
+    "OAT":     (12.0, 2.0, 90.0),
+    "TACH1":   (2400.0, 100.0, 19.0),
+    "MAP1":    (24.0, 2.0, 19.0),
+    "OILP1":   (60.0, 5.0, 37.0),
+    "OILT1":   (90.0, 5.0, 120.0),
+    "H2OT1":   (85.0, 5.0, 120.0),
+    "FUELP1":  (25.0, 2.0, 21.0),
+    "FUELF1":  (8.0, 1.0, 19.0),
+    "FUELQ1":  (15.0, 1.0, 300.0),
+    "FUELQ2":  (14.0, 1.0, 300.0),
+    "FUELQT":  (29.0, 2.0, 300.0),
+    "VOLT":    (13.8, 0.3, 43.0),
+    "CURRNT":  (5.0, 3.0, 43.0),
+}
+for cyl in range(1, 7):
+    SYNTHETIC["EGT1{0}".format(cyl)] = (1350.0 + 10 * cyl, 40.0, 19.0 + cyl)
+    SYNTHETIC["CHT1{0}".format(cyl)] = (370.0 + 5 * cyl, 15.0, 90.0 + cyl)
+
+
+# Stands in for pyavtools.fix.Database.  There is no network connection,
+# items are created from ITEMS the first time that they are asked for
+# and they start out good instead of failed.
+class Database(object):
+    def __init__(self):
+        self.items = {}
+        # The fix module normally sets up its logger when the real
+        # Database is created
+        fix.log = logging.getLogger(fix.__name__)
+
+    def define_item(self, key, dtype, min, max, units, aux):
+        item = fix.DB_Item(key, dtype)
+        if min is not None: item.min = min
+        if max is not None: item.max = max
+        item.units = units
+        item.init_aux(",".join(aux))
+        for each in aux:
+            item.aux[each] = aux[each]
+        item.annunciate = False
+        item.old = False
+        item.bad = False
+        item.fail = False
+        self.items[key] = item
+        return item
+
+    def get_item(self, key, create=False, wait=True):
+        try:
+            return self.items[key]
+        except KeyError:
+            pass
+        if key in ITEMS:
+            return self.define_item(key, *ITEMS[key])
+        return self.define_item(key, "float", -1e6, 1e6, "", {})
+
+    def set_value(self, key, value):
+        self.get_item(key).value = value
+
+    def mark_all_fail(self):
+        for each in self.items:
+            self.items[each].fail = True
+
+    def add_output(self, key, method):
+        pass
+
+    def queue_out(self, output):
+        pass
+
+    def stop(self):
+        pass
+
+
+# A sample is a tuple of (time, key, value, flags).  flags is a string
+# like "0010" or None.
+def parseLine(line):
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    t, rest = line.split(None, 1)
+    parts = rest.split(";")
+    flags = parts[2] if len(parts) > 2 else None
+    return (float(t), parts[0], parts[1], flags)
+
+def load(filename):
+    samples = []
+    with open(filename) as f:
+        for n, line in enumerate(f):
+            try:
+                s = parseLine(line)
+            except (ValueError, IndexError):
+                log.warning("Bad replay line {0} in {1}".format(n + 1, filename))
+                continue
+            if s is not None:
+                samples.append(s)
+    samples.sort(key=lambda s: s[0])
+    return samples
+
+def save(filename, samples):
+    with open(filename, "w") as f:
+        f.write("# pyEfis replay recording\n")
+        for t, key, value, flags in samples:
+            if flags is None:
+                f.write("{0:.3f} {1};{2}\n".format(t, key, value))
+            else:
+                f.write("{0:.3f} {1};{2};{3}\n".format(t, key, value, flags))
+
+def synthetic(duration=60.0, rate=20.0, keys=None):
+    """Returns samples for duration seconds with each key updated rate
+       times a second"""
+    if keys is None:
+        keys = sorted(SYNTHETIC)
+    samples = []
+    n = int(duration * rate)
+    for i in range(n):
+        t = i / rate
+        for key in keys:
+            center, amplitude, period = SYNTHETIC[key]
+            value = center + amplitude * math.sin(2 * math.pi * t / period)
+            samples.append((t, key, round(value, 3), "0000"))
+    return samples
+
+def apply(db, sample):
+    t, key, value, flags = sample
+    if "." in key:
+        key, aux = key.split(".", 1)
+        item = db.get_item(key)
+        if aux not in item.aux:
+            item.aux[aux] = None
+        item.set_aux_value(aux, value)
+        return
+    item = db.get_item(key)
+    item.value = value
+    if flags is not None:
+        item.annunciate = flags[0] == "1"
+        item.old = flags[1] == "1"
+        item.bad = flags[2] == "1"
+        item.fail = flags[3] == "1"
+
+
+# Feeds the samples into fix.db in real time.  speed makes the recording
+# play faster or slower.
+class Player(QObject):
+    finished = pyqtSignal()
+
+    def __init__(self, samples, speed=1.0, loop=True, parent=None):
+        super(Player, self).__init__(parent)
+        self.samples = samples
+        self.speed = speed
+        self.loop = loop
+        self.index = 0
+        self.count = 0
+        self.clock = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.play)
+
+    def start(self):
+        self.index = 0
+        self.clock.start()
+        self.play()
+
+    def stop(self):
+        self.timer.stop()
+
+    def play(self):
+        now = self.clock.elapsed() / 1000.0 * self.speed
+        while self.index < len(self.samples) and self.samples[self.index][0] <= now:
+            apply(fix.db, self.samples[self.index])
+            self.index += 1
+            self.count += 1
+        if self.index >= len(self.samples):
+            if self.loop and self.samples:
+                self.start()
+            else:
+                self.finished.emit()
+            return
+        wait = (self.samples[self.index][0] - now) / self.speed
+        self.timer.start(max(0, int(wait * 1000)))
+
+
+# Writes every change of the given keys in fix.db to a recording
+class Recorder(QObject):
+    def __init__(self, filename, keys, parent=None):
+        super(Recorder, self).__init__(parent)
+        self.file = open(filename, "w")
+        self.file.write("# pyEfis replay recording\n")
+        self.start = time.monotonic()
+        self.items = [fix.db.get_item(key) for key in keys]
+        for item in self.items:
+            for aux in item.aux:
+                if item.aux[aux] is not None:
+                    self.file.write("0.000 {0}.{1};{2}\n".format(item.key, aux,
+                                    item.aux[aux]))
+            item.valueChanged[item.dtype].connect(self.record)
+            for signal in [item.annunciateChanged, item.oldChanged,
+                           item.badChanged, item.failChanged]:
+                signal.connect(self.record)
+
+    def record(self, value=None):
+        item = self.sender()
+        flags = "".join(["1" if x else "0" for x in [item.annunciate,
+                         item.old, item.bad, item.fail]])
+        self.file.write("{0:.3f} {1};{2};{3}\n".format(
+                        time.monotonic() - self.start, item.key, item.value, flags))
+
+    def close(self):
+        for item in self.items:
+            item.valueChanged[item.dtype].disconnect(self.record)
+            for signal in [item.annunciateChanged, item.oldChanged,
+                           item.badChanged, item.failChanged]:
+                signal.disconnect(self.record)
+        self.file.close()
+
+
+player = None
+
+# Used in place of fix.initialize().  source is the name of a recording or
+# "synthetic" for generated data.
+def initialize(config, source="synthetic", speed=1.0, loop=True):
+    global player
+    log.info("Replaying data from {0}".format(source))
+    fix.db = Database()
+    # fix.stop() expects the scheduler to be running
+    scheduler.initialize()
+    if source == "synthetic":
+        samples = synthetic()
+    else:
+        samples = load(source)
+    player = Player(samples, speed, loop)
+    player.start()
+    return player
@@ -0,0 +1,112 @@
+#  Copyright (c) 2026 agent
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+# Shows the frame scheduler statistics for each screen and, when profiling
+# is turned on, the paint and redraw times of every instrument.
+
+from PyQt5.QtGui import *
+from PyQt5.QtCore import *
+from PyQt5.QtWidgets import *
+
+from pyefis import gui
+from pyefis import hub
+from pyefis import profiler
+from pyefis.common import textcache
+
+
+class Screen(QWidget):
+    def __init__(self, parent=None):
+        super(Screen, self).__init__(parent)
+        self.parent = parent
+        p = self.parent.palette()
+
+        self.screenColor = (0,0,0)
+        if self.screenColor:
+            p.setColor(self.backgroundRole(), QColor(*self.screenColor))
+            self.setPalette(p)
+            self.setAutoFillBackground(True)
+
+        self.fontSize = 12
+        self.font = QFont("Monospace")
+        self.font.setStyleHint(QFont.TypeWriter)
+        self.font.setPixelSize(self.fontSize)
+        self.lines = []
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+
+    def showEvent(self, event):
+        self.refresh()
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        lines = []
+        if gui.scheduler is not None:
+            lines.append("{0:12} {1:>8} {2:>8} {3:>8} {4:>8} {5:>9} {6:>8}".format(
+                         "Screen", "frames", "merged", "deferred", "overruns",
+                         "suspended", "max ms"))
+            for name, stats in sorted(gui.scheduler.stats.items(), key=lambda x: str(x[0])):
+                lines.append("{0:12} {1:8} {2:8} {3:8} {4:8} {5:9} {6:8.2f}".format(
+                             str(name)[:12], stats["frames"], stats["merged"],
+                             stats["deferred"], stats["overruns"],
+                             stats["suspended"], stats["max_time"] * 1000))
+        else:
+            lines.append("Frame scheduler is off")
+        stats = textcache.cache.getStats()
+        lines.append("Text cache {0} entries, {1:.1%} hits".format(stats["size"],
+                     stats["hit_rate"]))
+        counts = hub.subscriberCounts()
+        lines.append("Data hub {0} keys, {1} subscribers, {2} received, {3} coalesced".format(
+                     len(counts), sum(counts.values()), hub.stats["received"],
+                     hub.stats["coalesced"]))
+        shared = ["{0}:{1}".format(k, n) for k, n in sorted(counts.items()) if n > 1]
+        if shared:
+            lines.append("  Shared " + " ".join(shared))
+        lines.append("")
+
+        if not profiler.enabled:
+            lines.append("Instrument profiling is off.  Start with --profile or")
+            lines.append("set profile: True in the main configuration.")
+        else:
+            lines.append("{0:8} {1:28} {2:>7} {3:>7} {4:>7} {5:>7} {6:>7} {7:>6}".format(
+                         "Screen", "Instrument", "paint/s", "p50 ms", "p99 ms",
+                         "draw/s", "p99 ms", "supp"))
+            report = profiler.report()
+            report.sort(key=lambda r: r["paint_p99"] + r["redraw_p99"], reverse=True)
+            for r in report:
+                screen = gui.findScreen(r["widget"])
+                lines.append("{0:8} {1:28} {2:7.1f} {3:7.2f} {4:7.2f} {5:7.1f} {6:7.2f} {7:6}".format(
+                             screen.name[:8] if screen else "", r["name"][:28],
+                             r["paint_rate"], r["paint_p50"] * 1000,
+                             r["paint_p99"] * 1000, r["redraw_rate"],
+                             r["redraw_p99"] * 1000,
+                             getattr(r["widget"], "suppressedUpdates", "")))
+        self.lines = lines
+        self.update()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.setFont(self.font)
+        p.setPen(QColor(Qt.white))
+        lineHeight = QFontMetrics(self.font).lineSpacing()
+        y = lineHeight
+        for line in self.lines:
+            if y > self.height():
+                break
+            p.drawText(4, y, line)
+            y += lineHeight
@@ -39,6 +39,7 @@ def gauge_list(width, height):
             "type":gauges.ArcGauge,
             "key":"TACH" + ENGINE_NUMBER,
             "decPlaces":0,
+            "deadband":10,
             "width":240,
             "height":120,
             "x":0,
@@ -210,7 +211,9 @@ class Screen(QWidget):
         # objects for the screen based on the dictionary returned from
         # gauge_list().  We don't send the width and height yet because we
         # don't know it at this point.  We'll do this again on a resize to get
-        # the positions and sizes
+        # the positions and sizes.  The gauges are all drawn by one canvas
+        # widget so a change only repaints the gauge that changed.
+        self.canvas = gauges.GaugeCanvas(self)
         self.widget_list = []
         ilist = gauge_list(0,0)
         for item in ilist:
@@ -218,14 +221,15 @@ class Screen(QWidget):
                 keys = []
                 for cyl in range(item["cylinderCount"]):
                     keys.append("EGT{}{}".format(item["engine"], cyl+1))
-                i = gauges.EGTGroup(self, item["cylinderCount"], keys)
+                i = gauges.EGTGroup(self.canvas, item["cylinderCount"], keys)
             elif item["type"] == misc.StaticText:
-                i = misc.StaticText(item["name"], parent = self)
+                i = misc.StaticText(item["name"], parent = self.canvas)
             else:
-                i = item["type"](self)
+                i = item["type"](self.canvas)
             i.name = item["name"]
             if "key" in item: i.dbkey = item["key"]
             if "decPlaces" in item: i.decimalPlaces = item["decPlaces"]
+            if "deadband" in item: i.deadband = item["deadband"]
             if "showUnits" in item: i.showUnits = item["showUnits"]
             if "showName" in item: i.showName = item["showName"]
             if "units1" in item: i.unitsOverride1 = item["units1"]
@@ -233,13 +237,13 @@ class Screen(QWidget):
             if "unitFunction1" in item: i.conversionFunction1 = item["unitFunction1"]
             if "unitFunction2" in item: i.conversionFunction2 = item["unitFunction2"]
 
-            self.widget_list.append(i)
+            self.widget_list.append(self.canvas.addGauge(i))
 
         # Leaving this alone for now until I can fix the CHT grouping
-        self.cht = misc.StaticText("CHT", parent=self)
+        self.cht = self.canvas.addGauge(misc.StaticText("CHT", parent=self.canvas))
         self.chts = []
         for x in range(self.cylCount):
-            cht = gauges.VerticalBar(self)
+            cht = self.canvas.addGauge(gauges.VerticalBar(self.canvas))
 
             cht.name = str(x+1)
             cht.decimalPlaces = 0
@@ -255,9 +259,9 @@ class Screen(QWidget):
             item = fix.db.get_item(cht.dbkey)
             item.valueChanged.connect(self.chtMax)
 
-        self.chtmaxlabel = misc.StaticText("MAX", parent=self)
+        self.chtmaxlabel = self.canvas.addGauge(misc.StaticText("MAX", parent=self.canvas))
 
-        self.chtmax = gauges.NumericDisplay(self)
+        self.chtmax = self.canvas.addGauge(gauges.NumericDisplay(self.canvas))
         self.chtmax.name = "CHT Max"
         self.chtmax.decimalPlaces = 0
         self.chtmax.conversionFunction1 = lambda x: x * (9.0/5.0) + 32.0
@@ -321,23 +325,20 @@ class Screen(QWidget):
         # instHeight = self.height() - 60
 
         inst_list = gauge_list(self.width(), self.height())
+        self.canvas.resize(self.width(), self.height())
 
         for x, item in enumerate(inst_list):
-            self.widget_list[x].resize(item["width"], item["height"])
-            self.widget_list[x].move(item["x"], item["y"])
+            self.canvas.setGaugeGeometry(self.widget_list[x], item["x"], item["y"],
+                                         item["width"], item["height"])
 
         chtstartx = 380
-        self.cht.resize(200, 30)
-        self.cht.move(chtstartx, 170)
+        self.canvas.setGaugeGeometry(self.cht, chtstartx, 170, 200, 30)
 
         for x in range(len(self.chts)):
-            self.chts[x].resize(50, 150)
-            self.chts[x].move(chtstartx + (50*x), 200)
+            self.canvas.setGaugeGeometry(self.chts[x], chtstartx + (50*x), 200, 50, 150)
 
-        self.chtmaxlabel.resize(30,12)
-        self.chtmaxlabel.move(chtstartx + 10, 360)
-        self.chtmax.resize(75, 30)
-        self.chtmax.move(chtstartx + 45, 355)
+        self.canvas.setGaugeGeometry(self.chtmaxlabel, chtstartx + 10, 360, 30, 12)
+        self.canvas.setGaugeGeometry(self.chtmax, chtstartx + 45, 355, 75, 30)
         #
         #
         # self.hobbslabel.resize(100,15)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+@pytest.fixture
+def db():
+    import pyavtools.fix as fix
+    from pyefis import replay
+    saved = getattr(fix, "db", None)
+    fix.db = replay.Database()
+    yield fix.db
+    fix.db = saved
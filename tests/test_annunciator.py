@@ -0,0 +1,65 @@
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import Qt
+
+from pyefis.instruments.pa import AnnunciatorPanel, Panel_Annunciator
+
+
+class Panel(AnnunciatorPanel):
+    def __init__(self, *args, **kwargs):
+        super(Panel, self).__init__(*args, **kwargs)
+        self.updates = []
+
+    def update(self, *args):
+        self.updates.append(args)
+        super(Panel, self).update(*args)
+
+
+def color(widget, x, y):
+    return QColor(widget.grab().toImage().pixel(x, y))
+
+def make_panel(qapp):
+    panel = Panel(columns=2)
+    for label in ["OIL P", "FUEL", "VOLT"]:
+        panel.addAnnunciator(label)
+    panel.resize(200, 100)
+    panel.show()
+    qapp.processEvents()
+    panel.updates = []
+    return panel
+
+def test_unknown_state_is_not_added(qapp):
+    panel = make_panel(qapp)
+    i = panel.addAnnunciator("CANOPY", state=7)
+    assert panel.getState(i) == 0
+    panel.grab()
+
+def test_set_state_repaints_only_its_cell(qapp):
+    panel = make_panel(qapp)
+    panel.setState("FUEL", 2)
+    assert panel.updates == [(QRect(100, 0, 100, 50),)]
+    assert color(panel, 150, 5) == QColor(Qt.red)
+    assert color(panel, 50, 5) == QColor(Qt.black)
+    # Unknown states and repeats are ignored
+    panel.setState(1, 9)
+    panel.setState(1, 2)
+    assert len(panel.updates) == 1
+
+def test_set_label_repaints_its_cell(qapp):
+    panel = make_panel(qapp)
+    panel.setLabel(2, "AMPS")
+    assert panel.labels[2] == "AMPS"
+    assert panel.updates == [(QRect(0, 50, 100, 50),)]
+
+def test_panel_annunciator_restyles(qapp):
+    a = Panel_Annunciator()
+    a.setWARNING_Name("OIL P")
+    a.resize(100, 40)
+    a.show()
+    qapp.processEvents()
+    frame = a.frame
+    a.setState(1)
+    assert a.frame is frame
+    assert a.frame.brush().color() == QColor(Qt.yellow)
+    a.setState(5)
+    assert a.getState() == 1
@@ -0,0 +1,31 @@
+import concurrent.futures
+
+from pyefis.instruments.ai.VirtualVfr import PointOfView
+
+
+def finished(result=None, error=None):
+    future = concurrent.futures.Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+def test_failed_block_is_left_out():
+    pov = PointOfView(None, None, None)
+    pov.loading[(35, -106)] = finished(error=ValueError("corrupt block"))
+    pov.loading[(35, -107)] = finished(result=[])
+    assert pov.collect_blocks()
+    assert pov.prefetched == {(35, -107): []}
+    assert (35, -106) not in pov.object_cache
+    assert pov.retry_later((35, -106))
+
+def test_failed_block_is_retried():
+    pov = PointOfView(None, None, None)
+    pov.loading[(35, -106)] = finished(error=ValueError("corrupt block"))
+    pov.collect_blocks()
+    pov.failed[(35, -106)] -= pov.cache_refresh_period
+    assert not pov.retry_later((35, -106))
+    pov.loading[(35, -106)] = finished(result=[])
+    pov.collect_blocks()
+    assert pov.failed == {}
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import os
+
+import pyavtools.CIFPObjects as CIFPObjects
+
+from pyefis.instruments.ai.chartcache import BlockCache
+
+AIRPORT = "SUSAP KABQK2AABQ     0     137YHN35022015W106362974E011005355         1800018000C    MNAR    ALBUQUERQUE INTL SUNPORT"
+RUNWAY = "SUSAP KABQK2GRW03    0100000340 N35012009W106375017         +1595705305000060150IIBZY1                                     064111711"
+
+
+def database(tmp_path):
+    dbpath = str(tmp_path / "cifp.txt")
+    with open(dbpath, 'w', newline='') as f:
+        f.write(AIRPORT + "\r\n" + RUNWAY + "\r\n")
+    index_path = dbpath + ".idx"
+    with contextlib.redirect_stdout(io.StringIO()):
+        CIFPObjects.index_db(dbpath, index_path)
+    return dbpath, index_path
+
+def test_block_is_cached(tmp_path):
+    dbpath, index_path = database(tmp_path)
+    objects = BlockCache(dbpath, index_path).find_objects(35, -106)
+    assert len(objects) == 2
+    cache = BlockCache(dbpath, index_path)
+    assert [str(o) for o in cache.find_objects(35, -106)] == [str(o) for o in objects]
+    assert cache.hits == 1
+
+def test_failed_load_isnt_cached(tmp_path):
+    dbpath, index_path = database(tmp_path)
+    cache = BlockCache(dbpath, index_path)
+    saved = index_path + ".saved"
+    os.rename(index_path, saved)
+    assert cache.find_objects(35, -106) == []
+    os.rename(saved, index_path)
+    cache = BlockCache(dbpath, index_path)
+    assert len(cache.find_objects(35, -106)) == 2
+    assert cache.hits == 0
+
+def test_rebuilt_index_replaces_blocks(tmp_path):
+    dbpath, index_path = database(tmp_path)
+    BlockCache(dbpath, index_path).find_objects(35, -106)
+    st = os.stat(index_path)
+    os.utime(index_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    cache = BlockCache(dbpath, index_path)
+    cache.find_objects(35, -106)
+    assert cache.misses == 1
@@ -0,0 +1,78 @@
+from pyefis.instruments.gauges.abstract import AbstractGauge
+
+
+def gauge(decimalPlaces=0, deadband=None):
+    g = AbstractGauge()
+    g.decimalPlaces = decimalPlaces
+    g.deadband = deadband
+    g.highRange = 3000
+    return g
+
+def test_small_change_is_dropped(qapp):
+    g = gauge(decimalPlaces=1, deadband=1.0)
+    g.setValue(10.0)
+    g.setValue(10.02)
+    assert g.value == 10.0
+    assert g.suppressedUpdates == 1
+
+def test_change_across_limit_is_kept(qapp):
+    g = gauge(deadband=10)
+    g.highAlarm = 2700
+    g.setValue(2695)
+    g.setValue(2703)
+    assert g.value == 2703
+    assert g.valueColor == g.alarmColor
+
+def test_display_doesnt_creep(qapp):
+    g = gauge()
+    g.setValue(10.4)
+    g.setValue(10.8)
+    g.setValue(10.89)
+    assert g.valueText == "11"
+
+def test_fail_restore_is_never_dropped(qapp, db):
+    db.set_value("OILP1", 0.2)
+    g = gauge(deadband=5)
+    g.dbkey = "OILP1"
+    g.failFlag(True)
+    assert g.value == 0.0
+    g.failFlag(False)
+    assert g.value == 0.2
+
+def test_wide_deadband_is_applied(qapp):
+    g = gauge(deadband=10)
+    g.setValue(2400)
+    for value in (2401, 2403, 2405, 2402, 2408):
+        g.setValue(value)
+    assert g.value == 2400
+    assert g.suppressedUpdates == 5
+    g.setValue(2411)
+    assert g.value == 2411
+
+def test_wide_deadband_egt(qapp, db):
+    import pyefis.hmi as hmi
+    from pyefis.instruments.gauges.egt import EGTGroup
+    if hmi.actions is None:
+        hmi.initialize({})
+    keys = ["EGT11", "EGT12"]
+    g = EGTGroup(cylinders=2, dbkeys=keys)
+    g.conversionFunction = lambda x: x
+    g.deadband = 10
+    g.highAlarm[0] = 1500
+    g.setCylinder(0, 1400)
+    g.setCylinder(0, 1405)
+    assert g.values[0] == 1400
+    assert g.suppressedUpdates == 1
+    g.setCylinder(0, 1495)
+    g.setCylinder(0, 1502)
+    assert g.values[0] == 1502
+
+def test_wide_deadband_tape(qapp, db):
+    from pyefis.instruments.airspeed import Airspeed_Tape
+    t = Airspeed_Tape()
+    t.deadband = 2
+    t.setAirspeed(100)
+    t.setAirspeed(101.5)
+    assert t.airspeed == 100
+    t.setAirspeed(102)
+    assert t.airspeed == 102
@@ -0,0 +1,54 @@
+import gc
+from functools import partial
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject
+
+from pyefis import hub
+
+
+class Subscriber(QObject):
+    def __init__(self):
+        super(Subscriber, self).__init__()
+        self.values = []
+
+    def setValue(self, value):
+        self.values.append(value)
+
+    def setIndexed(self, i, value):
+        self.values.append((i, value))
+
+
+def setup_function(function):
+    hub.subscriptions.clear()
+    hub.pending.clear()
+
+def teardown_function(function):
+    hub.batching = False
+    hub.subscriptions.clear()
+    hub.pending.clear()
+
+def test_deleted_subscriber_is_dropped(qapp, db):
+    hub.batching = True
+    kept = Subscriber()
+    gone = Subscriber()
+    hub.subscribe("OILP1", kept.setValue)
+    hub.subscribe("OILP1", gone.setValue)
+    db.set_value("OILP1", 42.0)
+    sip.delete(gone)
+    hub.dispatch()
+    assert kept.values == [42.0]
+    assert hub.subscriberCounts()["OILP1"] == 1
+
+def test_hub_doesnt_keep_subscribers_alive(qapp, db):
+    s = Subscriber()
+    callback = partial(s.setIndexed, 2)
+    hub.subscribe("OILT1", s.setValue)
+    hub.subscribe("OILT1", callback)
+    hub.subscribe("OILT1", callback)
+    db.set_value("OILT1", 90.0)
+    assert s.values == [90.0, (2, 90.0)]
+    del s, callback
+    gc.collect()
+    db.set_value("OILT1", 91.0)
+    assert hub.subscriberCounts()["OILT1"] == 0
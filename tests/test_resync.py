@@ -0,0 +1,23 @@
+from pyefis.instruments.airspeed import Airspeed_Tape
+from pyefis.instruments.altimeter import Altimeter_Tape
+from pyefis.instruments.vsi import AS_Trend_Tape
+
+
+def test_resync_before_layout(qapp, db):
+    db.set_value("IAS", 120)
+    db.set_value("ALT", 3500)
+    tapes = [Airspeed_Tape(), Altimeter_Tape(), AS_Trend_Tape()]
+    for tape in tapes:
+        tape.resync()
+    assert tapes[0].airspeed == 120
+    assert tapes[1].altimeter == 3500
+
+def test_trend_tape_resync_redraws(qapp, db):
+    tape = AS_Trend_Tape()
+    tape.resize(30, 200)
+    tape.show()
+    qapp.processEvents()
+    tape._airspeed_trend.add(100)
+    tape._airspeed_trend.add(110)
+    tape.resync()
+    assert tape.trend_bar.rect().height() != 0
@@ -0,0 +1,38 @@
+from pyefis.common.trend import TrendEstimator
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ramp_rate():
+    clock = Clock()
+    trend = TrendEstimator(clock=clock)
+    for i in range(30):
+        clock.now = i * 0.1
+        trend.add(100 + i * 0.3)
+    assert abs(trend.rate() - 3.0) < 1e-6
+
+def test_rate_decays_when_samples_stop():
+    clock = Clock()
+    trend = TrendEstimator(window=2.0, clock=clock)
+    for i in range(30):
+        clock.now = i * 0.1
+        trend.add(1000 + i * 10)
+    assert trend.rate() > 0
+    # The value holds steady so nothing more is sent
+    clock.now += trend.window + 0.1
+    assert trend.rate() == 0.0
+    assert len(trend) == 0
+
+def test_rebase_keeps_rate():
+    clock = Clock()
+    trend = TrendEstimator(clock=clock)
+    for i in range(1000):
+        clock.now = 1e6 + i * 0.1
+        trend.add(i * 0.5)
+    assert abs(trend.rate() - 5.0) < 1e-6